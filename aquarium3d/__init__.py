@@ -14,10 +14,12 @@ __all__ = [
     "FishState",
     "Mesh",
     "AquariumRenderer",
+    "ThreeJSAquariumRenderer",
 ]
 
 if TYPE_CHECKING:  # pragma: no cover
     from .renderer import AquariumRenderer
+    from .threejs_renderer import ThreeJSAquariumRenderer
 
 
 def __getattr__(name: str):
@@ -25,4 +27,8 @@ def __getattr__(name: str):
         from .renderer import AquariumRenderer as _Renderer
 
         return _Renderer
+    if name == "ThreeJSAquariumRenderer":
+        from .threejs_renderer import ThreeJSAquariumRenderer as _ThreeRenderer
+
+        return _ThreeRenderer
     raise AttributeError(name)
@@ -5,11 +5,12 @@ import math
 from typing import List
 
 import matplotlib.pyplot as plt
+import numpy as np
 from matplotlib import animation
 from mpl_toolkits.mplot3d.art3d import Poly3DCollection
 
 from .mesh import Mesh
-from .simulation import FishState, GoldfishSimulator
+from .simulation import GoldfishSimulator
 
 
 class AquariumRenderer:
@@ -30,6 +31,11 @@ class AquariumRenderer:
         self.ax = self.fig.add_subplot(111, projection="3d")
         self.collections: List[Poly3DCollection] = []
         self.surface: Poly3DCollection | None = None
+        self._surface_xy: np.ndarray | None = None  # shape: (K, 2)
+        self._surface_ripple: np.ndarray | None = None  # shape: (K,)
+        # The base mesh never changes, so gather its triangle corners once;
+        # each frame is then a single batched rotation of this template.
+        self._tri_template = np.asarray(mesh.vertices, dtype=np.float32)[mesh.faces]  # (M, 3, 3)
         self._init_scene()
 
     def _init_scene(self) -> None:
@@ -75,45 +81,42 @@ class AquariumRenderer:
     def _draw_water_surface(self) -> None:
         tank = self.simulator.tank
         half = (tank[0] * 0.5, tank[1] * 0.5)
-        verts = [[
-            (-half[0], -half[1], tank[2]),
-            (half[0], -half[1], tank[2]),
-            (half[0], half[1], tank[2]),
-            (-half[0], half[1], tank[2]),
-        ]]
+        xy = np.array([
+            (-half[0], -half[1]),
+            (half[0], -half[1]),
+            (half[0], half[1]),
+            (-half[0], half[1]),
+        ])
+        # The wave only scales a fixed spatial pattern, so evaluate it once.
+        self._surface_xy = xy
+        self._surface_ripple = np.sin(xy.sum(axis=1) * 0.8)
+        verts = [np.column_stack([xy, np.full(len(xy), tank[2])])]
         surface = Poly3DCollection(verts, alpha=0.18)
         surface.set_facecolor((0.3, 0.55, 0.85, 0.18))
         self.ax.add_collection3d(surface)
         self.surface = surface
 
-    def _transform_mesh(self, fish: FishState) -> List[List[tuple[float, float, float]]]:
-        rot = fish.orientation
-        faces: List[List[tuple[float, float, float]]] = []
-        for tri in self.mesh.faces:
-            tri_vertices: List[tuple[float, float, float]] = []
-            for idx in tri:
-                vx, vy, vz = self.mesh.vertices[idx]
-                sx, sy, sz = vx * fish.scale, vy * fish.scale, vz * fish.scale
-                rx = rot[0][0] * sx + rot[0][1] * sy + rot[0][2] * sz
-                ry = rot[1][0] * sx + rot[1][1] * sy + rot[1][2] * sz
-                rz = rot[2][0] * sx + rot[2][1] * sy + rot[2][2] * sz
-                tri_vertices.append((rx + fish.position[0], ry + fish.position[1], rz + fish.position[2]))
-            faces.append(tri_vertices)
-        return faces
+    def _transform_meshes(self) -> np.ndarray:
+        """Return world-space triangles for every fish as an ``(N, M, 3, 3)`` array."""
+
+        sim = self.simulator
+        rotations = (sim.orientations * sim.scales[:, None, None]).astype(np.float32)
+        world = np.einsum("nij,mkj->nmki", rotations, self._tri_template, optimize=True)
+        world += sim.positions[:, None, None, :].astype(np.float32)
+        return world
 
     def _update_frame(self, _frame: int, dt: float) -> List[Poly3DCollection]:
         self.simulator.step(dt)
-        for fish, collection in zip(self.simulator.states(), self.collections):
-            faces = self._transform_mesh(fish)
+        triangles = self._transform_meshes()
+        for fish, collection, faces in zip(self.simulator.states(), self.collections, triangles):
             collection.set_verts(faces)
             alpha = 0.6 + 0.3 * (0.5 + 0.5 * math.sin(fish.phase))
             collection.set_alpha(alpha)
             collection.set_facecolor((1.0, 0.55 + 0.15 * math.sin(fish.phase), 0.35, alpha))
         if self.surface is not None:
             wave = 0.02 * math.sin(_frame * dt * 1.5)
-            verts = self.surface.get_verts()[0]
-            animated = [(x, y, self.simulator.tank[2] + wave * math.sin((x + y) * 0.8)) for (x, y, _z) in verts]
-            self.surface.set_verts([animated])
+            z = self.simulator.tank[2] + wave * self._surface_ripple
+            self.surface.set_verts([np.column_stack([self._surface_xy, z])])
         return self.collections
 
     def animate(self, seconds: float = 30.0, fps: int = 24, save_path: str | None = None) -> animation.FuncAnimation:
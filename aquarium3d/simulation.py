@@ -2,77 +2,142 @@
 from __future__ import annotations
 
 import math
-import random
-from dataclasses import dataclass
-from typing import Iterable, List, Sequence, Tuple
-
-Vector3 = Tuple[float, float, float]
-Matrix3 = Tuple[Tuple[float, float, float], Tuple[float, float, float], Tuple[float, float, float]]
-
-
-def _vec_add(a: Vector3, b: Vector3) -> Vector3:
-    return (a[0] + b[0], a[1] + b[1], a[2] + b[2])
-
-
-def _vec_sub(a: Vector3, b: Vector3) -> Vector3:
-    return (a[0] - b[0], a[1] - b[1], a[2] - b[2])
-
-
-def _vec_scale(v: Vector3, s: float) -> Vector3:
-    return (v[0] * s, v[1] * s, v[2] * s)
-
-
-def _vec_length(v: Vector3) -> float:
-    return math.sqrt(v[0] * v[0] + v[1] * v[1] + v[2] * v[2])
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+try:  # Numba is optional; the NumPy path below is used when it is missing.
+    from numba import njit, prange
+except ImportError:  # pragma: no cover - depends on the environment
+    njit = None
+
+# Below this many fish the dense pairwise distance matrix is cheaper than
+# binning the school into a uniform grid.
+_GRID_MIN_FISH = 64
+
+# Above this cosine the heading change per step is small enough that a
+# normalised lerp is visually identical to a true slerp and skips the acos.
+_NLERP_DOT = 0.99
+
+# Orientation frames are only rebuilt for fish whose heading moved by more
+# than this (in ``1 - cos`` of the angle) since the frame was last built.
+_ORIENTATION_TOLERANCE = 1e-3
+
+
+def _normalize_rows(v: np.ndarray) -> np.ndarray:
+    length = np.linalg.norm(v, axis=1, keepdims=True)
+    return np.divide(v, length, out=np.zeros_like(v), where=length > 0)
+
+
+def _orientations_from_directions(directions: np.ndarray) -> np.ndarray:
+    """Orthonormal ``(N, 3, 3)`` frames whose columns are forward, right and up."""
+
+    forward = _normalize_rows(directions)
+    up = np.zeros_like(forward)
+    flat = np.abs(forward[:, 2]) > 0.9
+    up[~flat, 2] = 1.0
+    up[flat, 1] = 1.0
+    right = _normalize_rows(np.cross(forward, up))
+    up = _normalize_rows(np.cross(right, forward))
+    return np.stack([forward, right, up], axis=2)
+
+
+if njit is not None:
+
+    @njit(cache=True, fastmath=True, parallel=True)
+    def _steering_kernel(P, V, limit, surface_z, cohesion, separation_distance,
+                         separation_strength, surface_damping, out):  # pragma: no cover - compiled
+        n = P.shape[0]
+        cx = 0.0
+        cy = 0.0
+        cz = 0.0
+        for k in range(n):
+            cx += P[k, 0]
+            cy += P[k, 1]
+            cz += P[k, 2]
+        cx /= n
+        cy /= n
+        cz /= n
+        for i in prange(n):
+            px = P[i, 0]
+            py = P[i, 1]
+            pz = P[i, 2]
+            hx = cx - px
+            hy = cy - py
+            hz = cz - pz
+            h_len = math.sqrt(hx * hx + hy * hy + hz * hz)
+            if h_len > 0:
+                hx /= h_len
+                hy /= h_len
+                hz /= h_len
+            sx = 0.0
+            sy = 0.0
+            sz = 0.0
+            for j in range(n):
+                dx = px - P[j, 0]
+                dy = py - P[j, 1]
+                dz = pz - P[j, 2]
+                dist = math.sqrt(dx * dx + dy * dy + dz * dz)
+                if 1e-6 < dist < separation_distance:
+                    sx += dx / dist
+                    sy += dy / dist
+                    sz += dz / dist
+            out[i, 0] = V[i, 0] + hx * cohesion + sx * separation_strength - px * 0.1
+            out[i, 1] = V[i, 1] + hy * cohesion + sy * separation_strength - py * 0.1
+            out[i, 2] = V[i, 2] + hz * cohesion + sz * separation_strength - pz * 0.1
+            for axis in range(3):
+                component = out[i, axis]
+                pos_axis = P[i, axis]
+                if (pos_axis < -limit[axis] and component < 0) or (pos_axis > limit[axis] and component > 0):
+                    out[i, axis] = -0.8 * component
+            if pz > surface_z:
+                out[i, 2] -= surface_damping * abs(out[i, 2])
 
+else:
+    _steering_kernel = None
 
-def _vec_dot(a: Vector3, b: Vector3) -> float:
-    return a[0] * b[0] + a[1] * b[1] + a[2] * b[2]
 
+class FishState:
+    """Row view into the structure-of-arrays state held by :class:`GoldfishSimulator`."""
 
-def _vec_normalize(v: Vector3) -> Vector3:
-    length = _vec_length(v)
-    if length == 0:
-        return (0.0, 0.0, 0.0)
-    return (v[0] / length, v[1] / length, v[2] / length)
+    __slots__ = ("_sim", "index")
 
+    def __init__(self, simulator: "GoldfishSimulator", index: int) -> None:
+        self._sim = simulator
+        self.index = index
 
-def _vec_cross(a: Vector3, b: Vector3) -> Vector3:
-    return (
-        a[1] * b[2] - a[2] * b[1],
-        a[2] * b[0] - a[0] * b[2],
-        a[0] * b[1] - a[1] * b[0],
-    )
+    @property
+    def position(self) -> np.ndarray:
+        return self._sim.positions[self.index]
 
+    @property
+    def velocity(self) -> np.ndarray:
+        return self._sim.velocities[self.index]
 
-def _orientation_from_direction(direction: Vector3) -> Matrix3:
-    forward = _vec_normalize(direction)
-    up = (0.0, 0.0, 1.0)
-    if abs(_vec_dot(up, forward)) > 0.9:
-        up = (0.0, 1.0, 0.0)
-    right = _vec_normalize(_vec_cross(forward, up))
-    up = _vec_normalize(_vec_cross(right, forward))
-    return (
-        (forward[0], right[0], up[0]),
-        (forward[1], right[1], up[1]),
-        (forward[2], right[2], up[2]),
-    )
+    @property
+    def orientation(self) -> np.ndarray:
+        return self._sim.orientations[self.index]
 
+    @property
+    def scale(self) -> float:
+        return float(self._sim.scales[self.index])
 
-@dataclass
-class FishState:
-    position: Vector3
-    velocity: Vector3
-    orientation: Matrix3
-    scale: float
-    phase: float
+    @property
+    def phase(self) -> float:
+        return float(self._sim.phases[self.index])
 
-    def forward(self) -> Vector3:
-        return (self.orientation[0][0], self.orientation[1][0], self.orientation[2][0])
+    def forward(self) -> np.ndarray:
+        return self.orientation[:, 0]
 
 
 class GoldfishSimulator:
-    """Simple schooling simulation running entirely on the CPU."""
+    """Simple schooling simulation running entirely on the CPU.
+
+    Fish state is stored as NumPy structure-of-arrays (``positions``,
+    ``velocities``, ``orientations``, ``scales`` and ``phases``) so that a step
+    is a handful of broadcasted array operations instead of a Python loop per
+    fish pair.
+    """
 
     def __init__(
         self,
@@ -85,9 +150,8 @@ class GoldfishSimulator:
         separation_distance: float = 0.18,
         separation_strength: float = 0.5,
         surface_damping: float = 0.4,
-        rng: random.Random | None = None,
+        rng: np.random.Generator | None = None,
     ) -> None:
-        self.fish: List[FishState] = []
         self.tank = tuple(float(x) for x in tank_size)
         self.min_speed = min_speed
         self.max_speed = max_speed
@@ -96,98 +160,149 @@ class GoldfishSimulator:
         self.separation_distance = separation_distance
         self.separation_strength = separation_strength
         self.surface_damping = surface_damping
-        self.rng = rng or random.Random()
-        for _ in range(fish_count):
-            self.fish.append(self._spawn_fish())
-
-    def _spawn_fish(self) -> FishState:
-        pos = tuple((self.rng.random() - 0.5) * axis for axis in self.tank)
-        heading = _random_direction(self.rng)
-        speed = self.rng.uniform(self.min_speed, self.max_speed)
-        velocity = _vec_scale(heading, speed)
-        orientation = _orientation_from_direction(heading)
-        scale = self.rng.uniform(0.8, 1.2)
-        phase = self.rng.random() * 2.0 * math.pi
-        return FishState(position=pos, velocity=velocity, orientation=orientation, scale=scale, phase=phase)
+        self.rng = rng or np.random.default_rng()
+
+        self._direction_pool = np.empty((0, 3))
+        self._spawn_school(fish_count)
+        self.fish: List[FishState] = [FishState(self, idx) for idx in range(fish_count)]
+        self._grid: Dict[Tuple[int, int, int], List[int]] = {}
+        if _steering_kernel is not None and fish_count:
+            # Compile (or load the cached build of) the kernel up front so the
+            # first animation frame does not stall on JIT compilation.
+            self._steering()
+
+    def _spawn_school(self, fish_count: int) -> None:
+        # One batched draw: 3 position, 2 heading, speed, scale and phase columns.
+        u = self.rng.random((fish_count, 8))
+        headings = _directions_from_uniform(u[:, 3:5])
+        speeds = self.min_speed + (self.max_speed - self.min_speed) * u[:, 5]
+        self.positions = (u[:, 0:3] - 0.5) * np.asarray(self.tank)
+        self.velocities = headings * speeds[:, None]
+        self.orientations = _orientations_from_directions(headings)
+        self.scales = 0.8 + 0.4 * u[:, 6]
+        self.phases = u[:, 7] * (2.0 * math.pi)
+
+    def _random_directions(self, count: int) -> np.ndarray:
+        """Take ``count`` uniformly distributed unit vectors from a pre-sampled pool."""
+
+        if len(self._direction_pool) < count:
+            fresh = _directions_from_uniform(self.rng.random((max(64, count), 2)))
+            self._direction_pool = np.concatenate([self._direction_pool, fresh])
+        directions = self._direction_pool[:count]
+        self._direction_pool = self._direction_pool[count:]
+        return directions
+
+    def _steering(self) -> np.ndarray:
+        """Return the un-normalised desired heading of every fish."""
+
+        P = self.positions
+        V = self.velocities
+        if _steering_kernel is not None:
+            desired = np.empty_like(P)
+            _steering_kernel(P, V, np.asarray(self.tank) * 0.5, self.tank[2] * 0.4, self.cohesion,
+                             self.separation_distance, self.separation_strength, self.surface_damping, desired)
+            return desired
+
+        cohesion_vec = _normalize_rows(P.mean(axis=0) - P)
+        separation_vec = self._separation()
+
+        desired = V + cohesion_vec * self.cohesion + separation_vec * self.separation_strength - P * 0.1
+
+        limit = np.asarray(self.tank) * 0.5
+        leaving = ((P < -limit) & (desired < 0)) | ((P > limit) & (desired > 0))
+        desired = np.where(leaving, -0.8 * desired, desired)
+
+        near_surface = P[:, 2] > self.tank[2] * 0.4
+        desired[near_surface, 2] -= self.surface_damping * np.abs(desired[near_surface, 2])
+        return desired
+
+    def _separation(self) -> np.ndarray:
+        """Sum of unit vectors pointing away from every neighbour closer than ``separation_distance``."""
+
+        P = self.positions
+        if len(P) < _GRID_MIN_FISH:
+            return _pairwise_separation(P, P, self.separation_distance)
+
+        # Bin fish into cells one separation distance wide: every neighbour
+        # that can contribute lies in one of the 27 surrounding cells.
+        self._grid.clear()
+        cells = np.floor(P / self.separation_distance).astype(np.int64)
+        for idx, cell in enumerate(map(tuple, cells.tolist())):
+            self._grid.setdefault(cell, []).append(idx)
+
+        separation = np.zeros_like(P)
+        for (cx, cy, cz), members in self._grid.items():
+            neighbours = [
+                j
+                for dx in (-1, 0, 1)
+                for dy in (-1, 0, 1)
+                for dz in (-1, 0, 1)
+                for j in self._grid.get((cx + dx, cy + dy, cz + dz), ())
+            ]
+            separation[members] = _pairwise_separation(P[members], P[neighbours], self.separation_distance)
+        return separation
 
     def step(self, dt: float) -> None:
         if not self.fish:
             return
-        center = (
-            sum(f.position[0] for f in self.fish) / len(self.fish),
-            sum(f.position[1] for f in self.fish) / len(self.fish),
-            sum(f.position[2] for f in self.fish) / len(self.fish),
-        )
-        updated: List[FishState] = []
-        for idx, fish in enumerate(self.fish):
-            cohesion_vec = _vec_sub(center, fish.position)
-            cohesion_len = _vec_length(cohesion_vec)
-            if cohesion_len > 0:
-                cohesion_vec = _vec_scale(cohesion_vec, 1.0 / cohesion_len)
-            separation_vec = (0.0, 0.0, 0.0)
-            for j, other in enumerate(self.fish):
-                if j == idx:
-                    continue
-                diff = _vec_sub(fish.position, other.position)
-                dist = _vec_length(diff)
-                if 1e-6 < dist < self.separation_distance:
-                    separation_vec = _vec_add(separation_vec, _vec_scale(diff, 1.0 / dist))
-            desired_dir = _vec_add(fish.velocity, _vec_scale(cohesion_vec, self.cohesion))
-            desired_dir = _vec_add(desired_dir, _vec_scale(separation_vec, self.separation_strength))
-            desired_dir = _vec_add(desired_dir, _vec_scale(fish.position, -0.1))
-
-            for axis in range(3):
-                limit = self.tank[axis] * 0.5
-                component = desired_dir[axis]
-                pos_axis = fish.position[axis]
-                if pos_axis < -limit and component < 0:
-                    desired_dir = desired_dir[:axis] + (-0.8 * component,) + desired_dir[axis + 1:]
-                elif pos_axis > limit and component > 0:
-                    desired_dir = desired_dir[:axis] + (-0.8 * component,) + desired_dir[axis + 1:]
-
-            if fish.position[2] > self.tank[2] * 0.4:
-                desired_dir = (
-                    desired_dir[0],
-                    desired_dir[1],
-                    desired_dir[2] - self.surface_damping * abs(desired_dir[2]),
-                )
-
-            desired_speed = _vec_length(desired_dir)
-            if desired_speed < 1e-6:
-                desired_dir = _random_direction(self.rng)
-                desired_speed = self.min_speed
-            else:
-                desired_dir = _vec_scale(desired_dir, 1.0 / desired_speed)
-                desired_speed = max(self.min_speed, min(self.max_speed, desired_speed))
-
-            current_dir = _vec_normalize(fish.velocity)
-            new_dir = _slerp(current_dir, desired_dir, min(1.0, self.turn_rate * dt))
-            new_velocity = _vec_scale(new_dir, desired_speed)
-            new_position = _vec_add(fish.position, _vec_scale(new_velocity, dt))
-            new_orientation = _orientation_from_direction(new_dir)
-            new_phase = (fish.phase + desired_speed * dt * 1.8) % (2.0 * math.pi)
-            updated.append(FishState(position=new_position, velocity=new_velocity, orientation=new_orientation,
-                                     scale=fish.scale, phase=new_phase))
-        self.fish = updated
-
-    def states(self) -> Iterable[FishState]:
-        return list(self.fish)
-
-
-def _random_direction(rng: random.Random) -> Vector3:
-    phi = rng.uniform(0.0, 2.0 * math.pi)
-    costheta = rng.uniform(-1.0, 1.0)
-    sintheta = math.sqrt(max(0.0, 1.0 - costheta * costheta))
-    return (math.cos(phi) * sintheta, math.sin(phi) * sintheta, costheta)
-
-
-def _slerp(a: Vector3, b: Vector3, t: float) -> Vector3:
-    dot = max(-1.0, min(1.0, _vec_dot(a, b)))
-    if dot > 0.9995:
-        blended = _vec_add(_vec_scale(a, 1.0 - t), _vec_scale(b, t))
-        return _vec_normalize(blended)
-    theta = math.acos(dot)
-    sin_theta = math.sin(theta)
-    factor_a = math.sin((1.0 - t) * theta) / sin_theta
-    factor_b = math.sin(t * theta) / sin_theta
-    return _vec_add(_vec_scale(a, factor_a), _vec_scale(b, factor_b))
+        P = self.positions
+        V = self.velocities
+        desired = self._steering()
+
+        desired_speed = np.linalg.norm(desired, axis=1)
+        stalled = desired_speed < 1e-6
+        desired_dir = np.divide(desired, desired_speed[:, None], out=np.zeros_like(desired),
+                                where=~stalled[:, None])
+        desired_speed = np.clip(desired_speed, self.min_speed, self.max_speed)
+        if stalled.any():
+            desired_dir[stalled] = self._random_directions(int(stalled.sum()))
+            desired_speed[stalled] = self.min_speed
+
+        new_dir = _slerp_rows(_normalize_rows(V), desired_dir, min(1.0, self.turn_rate * dt))
+        # Update the state arrays in place so views held by FishState and the
+        # renderers stay valid and no per-step state arrays are allocated.
+        np.multiply(new_dir, desired_speed[:, None], out=V)
+        P += V * dt
+        cached_forward = self.orientations[:, :, 0]
+        turned = np.einsum("ij,ij->i", cached_forward, new_dir) < 1.0 - _ORIENTATION_TOLERANCE
+        if turned.any():
+            self.orientations[turned] = _orientations_from_directions(new_dir[turned])
+        self.phases += desired_speed * (dt * 1.8)
+        np.mod(self.phases, 2.0 * math.pi, out=self.phases)
+
+    def states(self) -> Sequence[FishState]:
+        """Live views of every fish; the list itself must not be modified by callers."""
+
+        return self.fish
+
+
+def _directions_from_uniform(u: np.ndarray) -> np.ndarray:
+    """Map ``(N, 2)`` samples from ``[0, 1)`` to unit vectors uniform on the sphere."""
+
+    phi = u[:, 0] * (2.0 * math.pi)
+    costheta = u[:, 1] * 2.0 - 1.0
+    sintheta = np.sqrt(np.maximum(0.0, 1.0 - costheta * costheta))
+    return np.stack([np.cos(phi) * sintheta, np.sin(phi) * sintheta, costheta], axis=1)
+
+
+def _pairwise_separation(points: np.ndarray, neighbours: np.ndarray, separation_distance: float) -> np.ndarray:
+    diff = points[:, None, :] - neighbours[None, :, :]
+    dist = np.linalg.norm(diff, axis=2)
+    close = (dist > 1e-6) & (dist < separation_distance)
+    inv_dist = np.divide(1.0, dist, out=np.zeros_like(dist), where=close)
+    return (diff * inv_dist[..., None]).sum(axis=1)
+
+
+def _slerp_rows(a: np.ndarray, b: np.ndarray, t: float) -> np.ndarray:
+    """Spherical interpolation between matching rows of two ``(N, 3)`` unit-vector arrays."""
+
+    dot = np.clip(np.einsum("ij,ij->i", a, b), -1.0, 1.0)
+    nearly_parallel = dot > _NLERP_DOT
+    theta = np.arccos(dot)
+    sin_theta = np.sin(theta)
+    safe_sin = np.where(nearly_parallel | (sin_theta < 1e-12), 1.0, sin_theta)
+    factor_a = np.where(nearly_parallel, 1.0 - t, np.sin((1.0 - t) * theta) / safe_sin)
+    factor_b = np.where(nearly_parallel, t, np.sin(t * theta) / safe_sin)
+    blended = a * factor_a[:, None] + b * factor_b[:, None]
+    blended[nearly_parallel] = _normalize_rows(blended[nearly_parallel])
+    return blended
@@ -0,0 +1,122 @@
+"""WebGL renderer for the CPU aquarium simulation built on ``pythreejs``.
+
+The goldfish geometry is uploaded to the GPU once as a shared
+``BufferGeometry``; every frame only the per-fish 4x4 model matrices are
+updated. This avoids re-sending and re-sorting triangles on the CPU the way
+the Matplotlib backend has to. ``pythreejs`` renders through Jupyter widgets,
+so this backend only works inside a Jupyter notebook::
+
+    ThreeJSAquariumRenderer(generate_goldfish_mesh(), GoldfishSimulator()).animate()
+"""
+from __future__ import annotations
+
+import threading
+import time
+from typing import List
+
+import numpy as np
+import pythreejs as p3
+
+from .mesh import Mesh
+from .simulation import GoldfishSimulator
+
+
+class ThreeJSAquariumRenderer:
+    """Render :class:`GoldfishSimulator` state with ``pythreejs`` (WebGL)."""
+
+    def __init__(
+        self,
+        mesh: Mesh,
+        simulator: GoldfishSimulator,
+        background_color: str = "#021826",
+        water_color: str = "#0b3d61",
+        width: int = 800,
+        height: int = 500,
+    ) -> None:
+        self.mesh = mesh
+        self.simulator = simulator
+        if mesh.normals is None:
+            mesh.compute_normals()
+        assert mesh.normals is not None
+
+        attributes = {
+            "position": p3.BufferAttribute(array=np.asarray(mesh.vertices, dtype=np.float32), normalized=False),
+            "normal": p3.BufferAttribute(array=np.asarray(mesh.normals, dtype=np.float32), normalized=False),
+            "index": p3.BufferAttribute(array=np.asarray(mesh.faces, dtype=np.uint32).ravel(), normalized=False),
+        }
+        self.geometry = p3.BufferGeometry(attributes=attributes)
+        self.fish_meshes: List[p3.Mesh] = []
+        for _ in simulator.fish:
+            material = p3.MeshStandardMaterial(
+                color="#ff9452", roughness=0.45, metalness=0.1, transparent=True, opacity=0.85
+            )
+            self.fish_meshes.append(p3.Mesh(geometry=self.geometry, material=material, matrixAutoUpdate=False))
+
+        tank = simulator.tank
+        tank_box = p3.LineSegments(
+            geometry=p3.EdgesGeometry(p3.BoxBufferGeometry(width=tank[0], height=tank[1], depth=tank[2])),
+            material=p3.LineBasicMaterial(color="#1c5d8a"),
+            position=[0.0, 0.0, tank[2] * 0.5],
+        )
+        self.surface = p3.Mesh(
+            geometry=p3.PlaneBufferGeometry(width=tank[0], height=tank[1]),
+            material=p3.MeshBasicMaterial(color=water_color, transparent=True, opacity=0.18, side="DoubleSide"),
+            position=[0.0, 0.0, tank[2]],
+        )
+        self.camera = p3.PerspectiveCamera(
+            position=[tank[0] * 0.9, -tank[0] * 1.1, tank[2] * 1.4], up=[0.0, 0.0, 1.0], aspect=width / height
+        )
+        self.scene = p3.Scene(
+            children=[
+                p3.AmbientLight(intensity=0.8),
+                p3.DirectionalLight(position=[0.8, -1.2, 2.0], intensity=0.7),
+                tank_box,
+                self.surface,
+                self.camera,
+                *self.fish_meshes,
+            ],
+            background=background_color,
+        )
+        self.renderer = p3.Renderer(
+            camera=self.camera,
+            scene=self.scene,
+            controls=[p3.OrbitControls(controlling=self.camera)],
+            width=width,
+            height=height,
+        )
+        self._sync_matrices()
+
+    def _sync_matrices(self) -> None:
+        sim = self.simulator
+        matrices = np.zeros((len(self.fish_meshes), 4, 4))
+        matrices[:, :3, :3] = sim.orientations * sim.scales[:, None, None]
+        matrices[:, :3, 3] = sim.positions
+        matrices[:, 3, 3] = 1.0
+        # three.js stores matrix elements in column-major order.
+        for fish_mesh, matrix in zip(self.fish_meshes, matrices):
+            fish_mesh.matrix = tuple(matrix.T.ravel().tolist())
+
+    def update(self, dt: float) -> None:
+        self.simulator.step(dt)
+        self._sync_matrices()
+
+    def animate(self, seconds: float = 30.0, fps: int = 24) -> threading.Thread:
+        """Display the widget and advance the simulation on a background thread.
+
+        Notebook-only: outside Jupyter ``display`` just prints the widget repr, and
+        the returned daemon thread does not keep the process alive.
+        """
+
+        from IPython.display import display
+
+        display(self.renderer)
+        dt = 1.0 / fps
+
+        def _run() -> None:
+            for _ in range(int(seconds * fps)):
+                self.update(dt)
+                time.sleep(dt)
+
+        thread = threading.Thread(target=_run, daemon=True)
+        thread.start()
+        return thread
@@ -1,18 +1,35 @@
 # main.py
 import asyncio
-import json
 import math
-import random
-from typing import List, Dict, Any
+import struct
+import threading
+from pathlib import Path
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+import numpy as np
+import orjson
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import HTMLResponse
 
+try:  # MessagePack は任意。入っていれば subprotocol "msgpack" で配信できる
+    import msgpack
+except ImportError:  # pragma: no cover - depends on the environment
+    msgpack = None
+
+try:  # Numba も任意。入っていればタンクの1ティックを JIT コンパイルしたループで進める
+    from numba import njit
+except ImportError:  # pragma: no cover - depends on the environment
+    njit = None
+
 app = FastAPI()
 
 # 静的ファイル（index.html / app.js など）を配信
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
+# 既定画面は起動時に一度だけ読み込み、リクエストごとのファイル読み込みを省く
+INDEX_HTML = Path("static/index.html").read_text(encoding="utf-8")
+
 # ---- シミュレーション設定 ----
 FISH_COUNT = 18
 TICK_HZ = 20          # 送信レート（20Hz = 50ms)
@@ -20,177 +37,439 @@ SPEED_MIN = 0.05      # 規格化座標(0..1) / sec
 SPEED_MAX = 0.16
 TURN_NOISE = 1.2      # 向きのランダムゆらぎ（大きいほど曲がる）
 WALL_BOUNCE = 0.85    # 壁反射の強さ(0..1)
+STEP_GROUPS = 2       # 金魚をこの数の組に分け、1ティックに1組だけ進める（送信時は補間）
+
+# ---- バイナリ送信フォーマット ----
+# ヘッダ: b"STAT" + uint8 版数 + uint8 1匹あたりの値の数 + uint16 匹数  … 8バイト
+# 本体: 1匹あたり float16 × 13（リトルエンディアン）。id は行番号
+# 座標は 0..1 に規格化されているので半精度でも見た目は変わらず、送信量は float32 の半分になる。
+# 計算は float32 のまま行い、送信時にだけ丸める
+STATE_MAGIC = b"STAT"
+STATE_VERSION = 2
+STATE_HEADER = struct.Struct("<4sBBH")
+STATE_WIRE_DTYPE = np.dtype("<f2")
+STATE_COLUMNS = ("x", "y", "z", "vx", "vy", "vz", "dir", "speed", "scale", "hx", "hy", "hz", "flip")
+STATE_FIELDS = len(STATE_COLUMNS)
+
+# 1クライアントあたり溜めておける未送信フレーム数。これを超えて詰まる遅いクライアントは切断する
+SEND_QUEUE_SIZE = 8
 
 # 規格化空間(0..1)でシミュレーション、クライアント側でCanvasサイズに合わせて描画
-def _random_direction() -> List[float]:
-    azimuth = random.uniform(0, 2 * math.pi)
-    elevation = random.uniform(-math.pi / 6, math.pi / 6)
-    cos_elev = math.cos(elevation)
-    return [
-        cos_elev * math.cos(azimuth),
-        math.sin(elevation),
-        cos_elev * math.sin(azimuth),
-    ]
-
-
-def _normalize(vec: List[float]) -> List[float]:
-    length = math.sqrt(vec[0] ** 2 + vec[1] ** 2 + vec[2] ** 2)
-    if length < 1e-6:
-        return [1.0, 0.0, 0.0]
-    return [vec[0] / length, vec[1] / length, vec[2] / length]
-
-
-class Fish:
-    def __init__(self, idx: int):
-        self.id = idx
-        self.pos = [random.random(), random.random(), random.random()]
-        self.dir = _normalize(_random_direction())
-        self.speed = random.uniform(SPEED_MIN, SPEED_MAX)
-        self.scale = random.uniform(0.75, 1.25)
-        self.flip = 1
-        self.velocity = [self.dir[i] * self.speed for i in range(3)]
-
-    def _bounce_axis(self, axis: int, limit_low: float, limit_high: float) -> None:
-        if self.pos[axis] < limit_low:
-            self.pos[axis] = limit_low
-            self.dir[axis] = abs(self.dir[axis])
-            self.velocity[axis] = abs(self.velocity[axis])
-            self.speed = max(SPEED_MIN, self.speed * WALL_BOUNCE)
-        elif self.pos[axis] > limit_high:
-            self.pos[axis] = limit_high
-            self.dir[axis] = -abs(self.dir[axis])
-            self.velocity[axis] = -abs(self.velocity[axis])
-            self.speed = max(SPEED_MIN, self.speed * WALL_BOUNCE)
+# 状態配列の dtype。バイナリ送信時だけ STATE_WIRE_DTYPE に丸める
+STATE_DTYPE = np.float32
+# 壁反射の範囲（軸ごとの下限・上限、わずかなマージンを取る）
+BOUNDS_LOW = np.array([0.05, 0.05, 0.08], dtype=STATE_DTYPE)
+BOUNDS_HIGH = np.array([0.95, 0.95, 0.92], dtype=STATE_DTYPE)
+# 向きのゆらぎの軸ごとの倍率（上下方向は控えめ）
+JITTER_SCALE = np.array([1.0, 0.6, 1.0], dtype=STATE_DTYPE)
+
+
+def _random_directions(rng: np.random.Generator, count: int) -> np.ndarray:
+    azimuth = rng.uniform(0, 2 * math.pi, count)
+    elevation = rng.uniform(-math.pi / 6, math.pi / 6, count)
+    cos_elev = np.cos(elevation)
+    return np.stack(
+        [cos_elev * np.cos(azimuth), np.sin(elevation), cos_elev * np.sin(azimuth)], axis=1
+    ).astype(STATE_DTYPE)
+
+
+def _normalize_rows(vec: np.ndarray) -> np.ndarray:
+    # 行ごとに正規化（in-place）。長さがほぼ 0 の行は +x 方向にする
+    length = np.linalg.norm(vec, axis=1, keepdims=True)
+    degenerate = length[:, 0] < 1e-6
+    vec /= np.maximum(length, 1e-6)
+    vec[degenerate] = (1.0, 0.0, 0.0)
+    return vec
+
+
+if njit is not None:
+
+    @njit(cache=True, fastmath=True)
+    def _step_kernel(pos, dir_, vel, speed, flip, draws, dt, noise, low, high, jitter_scale):  # pragma: no cover - compiled
+        # NumPy 版 Tank.step と同じ更新を1匹ずつのループで行う
+        for i in range(pos.shape[0]):
+            for k in range(3):
+                jitter = (draws[i, k] * 2.0 - 1.0) * jitter_scale[k] * noise
+                dir_[i, k] += jitter + (0.5 - pos[i, k]) * (0.15 * dt)
+            length = math.sqrt(dir_[i, 0] ** 2 + dir_[i, 1] ** 2 + dir_[i, 2] ** 2)
+            if length < 1e-6:
+                dir_[i, 0] = 1.0
+                dir_[i, 1] = 0.0
+                dir_[i, 2] = 0.0
+            else:
+                inv = 1.0 / length
+                for k in range(3):
+                    dir_[i, k] *= inv
+
+            bounces = 0
+            for k in range(3):
+                pos[i, k] += dir_[i, k] * speed[i] * dt
+                if pos[i, k] < low[k]:
+                    pos[i, k] = low[k]
+                    dir_[i, k] = abs(dir_[i, k])
+                    bounces += 1
+                elif pos[i, k] > high[k]:
+                    pos[i, k] = high[k]
+                    dir_[i, k] = -abs(dir_[i, k])
+                    bounces += 1
+            if bounces > 0:
+                speed[i] = max(SPEED_MIN, speed[i] * WALL_BOUNCE ** bounces)
+            for k in range(3):
+                vel[i, k] = dir_[i, k] * speed[i]
+
+            if draws[i, 3] < 0.05:
+                speed[i] = min(SPEED_MAX, speed[i] * 1.05)
+            elif draws[i, 4] < 0.05:
+                speed[i] = max(SPEED_MIN, speed[i] * 0.97)
+            flip[i] = -1.0 if vel[i, 0] < 0 else 1.0
+
+else:
+    _step_kernel = None
+
+
+class Tank:
+    """全ての金魚の状態を列ごとの配列（SoA）で保持し、ufunc でまとめて更新する。"""
+
+    def __init__(self, fish_count: int, rng: Optional[np.random.Generator] = None, groups: int = STEP_GROUPS):
+        self.rng = rng or np.random.default_rng()
+        n = fish_count
+        self.groups = max(1, groups)
+        self.ids = np.arange(n)
+        self.pos = self.rng.random((n, 3), dtype=STATE_DTYPE)
+        self.dir = _normalize_rows(_random_directions(self.rng, n))
+        self.speed = self.rng.uniform(SPEED_MIN, SPEED_MAX, n).astype(STATE_DTYPE)
+        self.scale = self.rng.uniform(0.75, 1.25, n).astype(STATE_DTYPE)
+        self.flip = np.ones(n, dtype=STATE_DTYPE)
+        self.velocity = self.dir * self.speed[:, None]
+        # 直前に進めたときの位置。送信時は prev_pos と pos の間を補間する
+        self.prev_pos = self.pos.copy()
+        # 何ティック目か、とそのティックでエンコード済みのフレーム（形式ごと）
+        self.tick_id = 0
+        self._encoded: Tuple[int, Dict[str, bytes]] = (0, {})
+        # step と encode を排他にする。イベントループ側の encode が進行中のティックを読まないように
+        self._lock = threading.Lock()
 
     def step(self, dt: float):
-        # ランダムな揺らぎで方向ベクトルを変化させる
-        jitter = [
-            random.uniform(-TURN_NOISE, TURN_NOISE) * dt,
-            random.uniform(-TURN_NOISE, TURN_NOISE) * dt * 0.6,
-            random.uniform(-TURN_NOISE, TURN_NOISE) * dt,
-        ]
-        self.dir = _normalize([
-            self.dir[0] + jitter[0],
-            self.dir[1] + jitter[1],
-            self.dir[2] + jitter[2],
-        ])
-
-        # ゆるやかな中心回帰で群れのまとまりを保つ
-        center_pull = [(0.5 - self.pos[i]) * 0.15 * dt for i in range(3)]
-        self.dir = _normalize([
-            self.dir[0] + center_pull[0],
-            self.dir[1] + center_pull[1],
-            self.dir[2] + center_pull[2],
-        ])
-
-        # 速度ベクトルを更新
-        self.velocity = [self.dir[i] * self.speed for i in range(3)]
-
-        # 位置を更新
-        for i in range(3):
-            self.pos[i] += self.velocity[i] * dt
-
-        # 境界反射（わずかなマージンを取る）
-        self._bounce_axis(0, 0.05, 0.95)
-        self._bounce_axis(1, 0.05, 0.95)
-        self._bounce_axis(2, 0.08, 0.92)
-        self.dir = _normalize(self.dir)
-        self.velocity = [self.dir[i] * self.speed for i in range(3)]
+        with self._lock:
+            self.tick_id += 1
+            # 組 g は g, g+G, g+2G, ... 行目。スライスなので各配列はビューのまま in-place で更新できる
+            rows = slice(self.tick_id % self.groups, None, self.groups)
+            self.prev_pos[rows] = self.pos[rows]
+            self._advance(rows, dt * self.groups)
+
+    def _advance(self, rows: slice, dt: float):
+        pos = self.pos[rows]
+        dir_ = self.dir[rows]
+        vel = self.velocity[rows]
+        speed = self.speed[rows]
+        flip = self.flip[rows]
+        n = len(pos)
+
+        # このティックで使う乱数を一度に引く：列 0-2 は向きの揺らぎ、3-4 は速度変化の判定
+        draws = self.rng.random((n, 5), dtype=STATE_DTYPE)
+        # 1回で G ティック分進めるので、速度変化の起こる確率も G 倍にして頻度を揃える
+        draws[:, 3:] /= self.groups
+        # 揺らぎも G ティック分を1回で引くので、振幅は G 倍ではなく √G 倍にして1秒あたりの分散を揃える
+        noise = TURN_NOISE * dt / math.sqrt(self.groups)
+        if _step_kernel is not None:
+            _step_kernel(pos, dir_, vel, speed, flip, draws, dt, noise,
+                         BOUNDS_LOW, BOUNDS_HIGH, JITTER_SCALE)
+            return
+
+        # ランダムな揺らぎで方向ベクトルを変化させる（配列はすべて in-place で更新）
+        jitter = draws[:, :3]
+        jitter *= 2.0
+        jitter -= 1.0
+        jitter *= JITTER_SCALE * noise
+        dir_ += jitter
+
+        # ゆるやかな中心回帰で群れのまとまりを保つ（揺らぎと合わせて正規化は1回だけ）
+        dir_ += (0.5 - pos) * (0.15 * dt)
+        _normalize_rows(dir_)
+
+        # 速度ベクトル・位置を更新
+        np.multiply(dir_, speed[:, None], out=vel)
+        pos += vel * dt
+
+        # 境界反射：はみ出した軸だけ向きを内側へ、反射した軸の数だけ減速
+        low = pos < BOUNDS_LOW
+        high = pos > BOUNDS_HIGH
+        np.clip(pos, BOUNDS_LOW, BOUNDS_HIGH, out=pos)
+        np.copyto(dir_, np.abs(dir_), where=low)
+        np.copyto(dir_, -np.abs(dir_), where=high)
+        bounces = (low | high).sum(axis=1)
+        np.copyto(speed, np.maximum(SPEED_MIN, speed * WALL_BOUNCE ** bounces), where=bounces > 0)
+        # 反射は符号を反転するだけで長さは変わらないので再正規化は不要
+        np.multiply(dir_, speed[:, None], out=vel)
 
         # 速度の自然な変化
-        if random.random() < 0.05:
-            self.speed = min(SPEED_MAX, self.speed * 1.05)
-        elif random.random() < 0.05:
-            self.speed = max(SPEED_MIN, self.speed * 0.97)
+        roll = draws[:, 3:]
+        faster = roll[:, 0] < 0.05
+        slower = ~faster & (roll[:, 1] < 0.05)
+        np.copyto(speed, np.minimum(SPEED_MAX, speed * 1.05), where=faster)
+        np.copyto(speed, np.maximum(SPEED_MIN, speed * 0.97), where=slower)
 
         # 左右反転ヒント
-        self.flip = -1 if self.velocity[0] < 0 else 1
+        np.copyto(flip, np.where(vel[:, 0] < 0, -1.0, 1.0))
+
+    def positions(self) -> np.ndarray:
+        """送信用の位置。各組を最後に進めてからの経過ティックに応じて prev_pos と pos を補間する。
 
-    def to_dict(self) -> Dict[str, Any]:
-        heading = _normalize(self.velocity)
+        進めた直後の組は 1/G、G-1 ティック前に進めた組は 1 の位置になるので、
+        全員が同じ時刻（(G-1) ティック遅れ）の位置として揃う。
+        """
+        if self.groups == 1:
+            return self.pos
+        since = (self.tick_id - self.ids) % self.groups
+        alpha = ((since + 1) / self.groups).astype(STATE_DTYPE)[:, None]
+        return self.prev_pos + (self.pos - self.prev_pos) * alpha
+
+    def headings(self) -> np.ndarray:
+        return np.arctan2(self.velocity[:, 1], self.velocity[:, 0])
+
+    def _columns(self) -> Dict[str, np.ndarray]:
+        # 列指向の状態：1匹ずつ dict を作らず、列ごとの ndarray を並べる
+        # （orjson の OPT_SERIALIZE_NUMPY は C 連続な配列が必要なので軸を入れ替えてから行を使う）
+        pos = np.ascontiguousarray(self.positions().T)
+        vel = np.ascontiguousarray(self.velocity.T)
+        heading = np.ascontiguousarray(_normalize_rows(self.velocity.copy()).T)
         return {
-            "id": self.id,
-            "x": self.pos[0],
-            "y": self.pos[1],
-            "z": self.pos[2],
-            "dir": math.atan2(self.velocity[1], self.velocity[0]),
+            "ids": self.ids,
+            "x": pos[0],
+            "y": pos[1],
+            "z": pos[2],
+            "dir": self.headings(),
             "scale": self.scale,
-            "flip": self.flip,
-            "vx": self.velocity[0],
-            "vy": self.velocity[1],
-            "vz": self.velocity[2],
+            "flip": self.flip.astype(np.int8),
+            "vx": vel[0],
+            "vy": vel[1],
+            "vz": vel[2],
             "speed": self.speed,
-            "heading": {"x": heading[0], "y": heading[1], "z": heading[2]},
+            "hx": heading[0],
+            "hy": heading[1],
+            "hz": heading[2],
         }
 
-class Tank:
-    def __init__(self, fish_count: int):
-        self.fish: List[Fish] = [Fish(i) for i in range(fish_count)]
+    def snapshot(self) -> bytes:
+        return orjson.dumps(
+            {"type": "state", **self._columns()}, option=orjson.OPT_SERIALIZE_NUMPY
+        )
 
-    def step(self, dt: float):
-        for f in self.fish:
-            f.step(dt)
+    def snapshot_msgpack(self) -> bytes:
+        columns = {name: column.tolist() for name, column in self._columns().items()}
+        # 状態は float32 なので単精度で詰めても情報は落ちない
+        return msgpack.packb({"type": "state", **columns}, use_bin_type=True, use_single_float=True)
 
-    def snapshot(self) -> Dict[str, Any]:
-        return {"type": "state", "fish": [f.to_dict() for f in self.fish]}
+    def snapshot_bytes(self) -> bytes:
+        # 列の並びは STATE_COLUMNS と同じ
+        state = np.empty((len(self.ids), STATE_FIELDS), dtype=STATE_WIRE_DTYPE)
+        state[:, 0:3] = self.positions()
+        state[:, 3:6] = self.velocity
+        state[:, 6] = self.headings()
+        state[:, 7] = self.speed
+        state[:, 8] = self.scale
+        state[:, 9:12] = _normalize_rows(self.velocity.copy())
+        state[:, 12] = self.flip
+        return STATE_HEADER.pack(STATE_MAGIC, STATE_VERSION, STATE_FIELDS, len(self.ids)) + state.tobytes()
+
+    def _encode(self, fmt: str) -> bytes:
+        if fmt == "json":
+            return self.snapshot()
+        if fmt == "msgpack":
+            return self.snapshot_msgpack()
+        return self.snapshot_bytes()
+
+    def encode(self, fmt: str) -> bytes:
+        # 1ティックにつき形式ごとに1回だけエンコードし、同じ bytes を使い回す。
+        # ロック中は step が走らないので、キャッシュされるのは常に進め終わったティックの状態
+        with self._lock:
+            tick, frames = self._encoded
+            if tick != self.tick_id:
+                tick, frames = self.tick_id, {}
+                self._encoded = (tick, frames)
+            frame = frames.get(fmt)
+            if frame is None:
+                frame = frames[fmt] = self._encode(fmt)
+            return frame
 
 tank = Tank(FISH_COUNT)
 
 # ---- WebSocket ルーム管理 ----
 class ConnectionManager:
+    """接続ごとに上限付きの送信キューと送信タスクを持ち、配信側は待たずにキューへ積むだけにする。"""
+
     def __init__(self):
         self.active: List[WebSocket] = []
+        # 接続ごとの送信フォーマット（"binary" または "json"）
+        self.formats: Dict[WebSocket, str] = {}
+        self.queues: Dict[WebSocket, "asyncio.Queue[bytes]"] = {}
+        self.writers: Dict[WebSocket, "asyncio.Task[None]"] = {}
+        # シミュレーションスレッドから参照するため、変更のたびに丸ごと差し替える
+        self._formats_in_use: FrozenSet[str] = frozenset()
 
-    async def connect(self, ws: WebSocket):
-        await ws.accept()
+    async def connect(self, ws: WebSocket, fmt: str = "binary", subprotocol: Optional[str] = None):
+        await ws.accept(subprotocol=subprotocol)
         self.active.append(ws)
+        self.formats[ws] = fmt
+        self.queues[ws] = asyncio.Queue(maxsize=SEND_QUEUE_SIZE)
+        self.writers[ws] = asyncio.create_task(self._writer(ws))
+        self._formats_in_use = frozenset(self.formats.values())
 
     def disconnect(self, ws: WebSocket):
         if ws in self.active:
             self.active.remove(ws)
+        self.formats.pop(ws, None)
+        self.queues.pop(ws, None)
+        writer = self.writers.pop(ws, None)
+        if writer is not None and writer is not asyncio.current_task():
+            writer.cancel()
+        self._formats_in_use = frozenset(self.formats.values())
 
-    async def broadcast(self, message: str):
-        # 途中切断などを吸収
-        dead = []
-        for ws in self.active:
-            try:
-                await ws.send_text(message)
-            except Exception:
-                dead.append(ws)
-        for ws in dead:
+    def formats_in_use(self) -> FrozenSet[str]:
+        return self._formats_in_use
+
+    async def _writer(self, ws: WebSocket):
+        # このソケットへの送信はすべてこのタスクが順番に行う
+        queue = self.queues[ws]
+        try:
+            while True:
+                await ws.send_bytes(await queue.get())
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            self.disconnect(ws)
+
+    def send(self, ws: WebSocket, message: bytes):
+        # キューが一杯（送信が追いつかない）なら、そのクライアントは切断する
+        queue = self.queues.get(ws)
+        if queue is None:
+            return
+        try:
+            queue.put_nowait(message)
+        except asyncio.QueueFull:
             self.disconnect(ws)
+            asyncio.create_task(self._close(ws))
+
+    @staticmethod
+    async def _close(ws: WebSocket):
+        try:
+            await ws.close(code=1013)
+        except Exception:
+            pass
+
+    def broadcast(self, frames: Dict[str, bytes]):
+        # 各クライアントのキューへ積むだけなので、遅いクライアントが他を待たせることはない。
+        # frames はティックごとに1回だけエンコード済みの bytes で、ここでは再エンコードしない
+        for ws in list(self.active):
+            self.send(ws, frames[self.formats[ws]])
 
 manager = ConnectionManager()
 
+
+class SimulationRunner:
+    """専用スレッドでタンクを進め、最新フレームだけを保持する。
+
+    スレッドは毎ティック `latest` を新しい dict へ差し替えるだけなので、
+    イベントループ側はロックなしで最新フレームを読める。
+    """
+
+    def __init__(self, tank: Tank, tick: float):
+        self.tank = tank
+        self.tick = tick
+        self.latest: Dict[str, bytes] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="simulation", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.tank.step(self.tick)
+            # 使われているフォーマットだけを1回ずつエンコードする
+            self.latest = {fmt: self.tank.encode(fmt) for fmt in manager.formats_in_use()}
+            self._stop.wait(self.tick)
+
+    def frame(self, fmt: str) -> bytes:
+        # 接続直後の初回送信用。同じティックなら配信と同じ bytes を返す
+        frame = self.latest.get(fmt)
+        return frame if frame is not None else self.tank.encode(fmt)
+
+
+runner = SimulationRunner(tank, 1.0 / TICK_HZ)
+
 @app.get("/")
 async def root():
     # static/index.html を既定画面に
-    return HTMLResponse(open("static/index.html", "r", encoding="utf-8").read())
+    return HTMLResponse(INDEX_HTML)
 
 @app.websocket("/ws")
 async def websocket_endpoint(ws: WebSocket):
-    await manager.connect(ws)
+    # 既定はバイナリ、?format=json で従来の JSON を返す。
+    # クライアントが subprotocol "msgpack" を要求し、msgpack が使える場合は MessagePack
+    subprotocol = None
+    if msgpack is not None and "msgpack" in ws.scope.get("subprotocols", []):
+        fmt = subprotocol = "msgpack"
+    else:
+        fmt = "json" if ws.query_params.get("format") == "json" else "binary"
+    await manager.connect(ws, fmt, subprotocol)
     try:
         # 接続直後に初期スナップショットを返す
-        await ws.send_text(json.dumps(tank.snapshot()))
+        manager.send(ws, runner.frame(fmt))
         # クライアントからのメッセージ（将来：設定変更など）を受け取る準備
+        # 中身は今は使わないので、テキストのデコードや UTF-8 検証をせず生のメッセージで受ける
         while True:
-            _ = await ws.receive_text()  # 今は特に使わない（ping/pong用途など）
+            message = await ws.receive()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", 1000))
     except WebSocketDisconnect:
         manager.disconnect(ws)
     except Exception:
         manager.disconnect(ws)
 
-# ---- シミュレーションループ（バックグラウンドタスク） ----
-async def simulation_loop():
+# ---- 配信ループ（バックグラウンドタスク） ----
+async def broadcast_loop():
+    # シミュレーションは専用スレッドで進むため、ここでは最新フレームを配るだけ
     tick = 1.0 / TICK_HZ
+    last_sent: Optional[Dict[str, bytes]] = None
     while True:
-        tank.step(tick)
-        if manager.active:
-            await manager.broadcast(json.dumps(tank.snapshot()))
         await asyncio.sleep(tick)
+        frames = runner.latest
+        if manager.active and frames is not last_sent:
+            # 新しく接続したクライアントの形式がまだ無ければ次のティックで送る
+            if all(fmt in frames for fmt in manager.formats_in_use()):
+                manager.broadcast(frames)
+                last_sent = frames
 
 @app.on_event("startup")
 async def on_startup():
-    # バックグラウンドでシミュレーション開始
-    asyncio.create_task(simulation_loop())
+    # シミュレーションスレッドと配信タスクを開始
+    runner.start()
+    asyncio.create_task(broadcast_loop())
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    runner.stop()
+
+
+if __name__ == "__main__":
+    import importlib.util
+
+    import uvicorn
+
+    # uvloop / httptools は uvicorn[standard] に含まれる（uvloop は Windows 非対応なのでその場合は asyncio）
+    uvicorn.run(
+        app,
+        host="0.0.0.0",
+        port=8000,
+        loop="uvloop" if importlib.util.find_spec("uvloop") else "asyncio",
+        http="httptools",
+    )
@@ -64,70 +64,55 @@ class GoldfishModel:
         xs = np.linspace(-self.body_length * 0.65, self.body_length * 0.35, self.segments)
         thetas = np.linspace(0, 2 * np.pi, self.radial_slices, endpoint=False)
 
-        verts = []
-        colors = []
-        for x in xs:
-            # 胴体の半径分布（正規分布でふっくらさせる）
-            sigma = self.body_length * 0.35
-            radius = self.body_radius * np.exp(-((x + self.body_length * 0.15) ** 2) / (2 * sigma**2))
-            # 尾側は徐々に細く
-            if x > self.body_length * 0.05:
-                taper = 1.0 - (x - self.body_length * 0.05) / (self.body_length * 0.45)
-                radius *= max(0.15, taper)
-
-            hue = 0.04 + 0.05 * np.clip((x + self.body_length * 0.2) / self.body_length, 0, 1)
-            saturation = 0.75
-            value = 0.85 + 0.1 * np.clip(radius / self.body_radius, 0, 1)
-            color = np.array(_hsv_to_rgb(hue, saturation, value))
-
-            for theta in thetas:
-                y = np.cos(theta) * radius
-                z = np.sin(theta) * radius
-                verts.append([x, y, z])
-                colors.append(color)
-
-        verts = np.asarray(verts, dtype=np.float32)
-        colors = np.asarray(colors, dtype=np.float32)
+        # 胴体の半径分布（正規分布でふっくらさせる）
+        sigma = self.body_length * 0.35
+        radius = self.body_radius * np.exp(-((xs + self.body_length * 0.15) ** 2) / (2 * sigma**2))
+        # 尾側は徐々に細く
+        taper = 1.0 - (xs - self.body_length * 0.05) / (self.body_length * 0.45)
+        radius = np.where(xs > self.body_length * 0.05, radius * np.maximum(0.15, taper), radius)
+
+        ring_x = np.broadcast_to(xs[:, None], (self.segments, self.radial_slices))
+        verts = np.stack(
+            [ring_x, np.outer(radius, np.cos(thetas)), np.outer(radius, np.sin(thetas))], axis=-1
+        ).reshape(-1, 3).astype(np.float32)
+
+        hue = 0.04 + 0.05 * np.clip((xs + self.body_length * 0.2) / self.body_length, 0, 1)
+        saturation = 0.75
+        value = 0.85 + 0.1 * np.clip(radius / self.body_radius, 0, 1)
+        ring_colors = _hsv_to_rgb(hue, saturation, value)
+        colors = np.repeat(ring_colors, self.radial_slices, axis=0).astype(np.float32)
 
-        faces = []
         ring = self.radial_slices
-        for i in range(self.segments - 1):
-            for j in range(ring):
-                a = i * ring + j
-                b = i * ring + (j + 1) % ring
-                c = (i + 1) * ring + j
-                d = (i + 1) * ring + (j + 1) % ring
-                faces.append([a, c, b])
-                faces.append([b, c, d])
-
-        faces = np.asarray(faces, dtype=np.int32)
+        j = np.arange(ring)
+        starts = np.arange(self.segments - 1)[:, None] * ring
+        a = starts + j
+        b = starts + (j + 1) % ring
+        c = a + ring
+        d = b + ring
+        faces = np.stack([np.stack([a, c, b], axis=-1), np.stack([b, c, d], axis=-1)], axis=2)
+        faces = faces.reshape(-1, 3).astype(np.int32)
         return verts, faces, colors
 
     def _build_tail(self, offset: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
         slices = 8
         span = self.tail_length
         heights = np.linspace(0.0, 0.35, slices)
-        verts = []
-        colors = []
-        for i, h in enumerate(heights):
-            sway = np.sin(i / (slices - 1) * np.pi) * 0.08
-            verts.extend(
-                [
-                    [self.body_length * 0.35 + (i / (slices - 1)) * span, h, sway],
-                    [self.body_length * 0.35 + (i / (slices - 1)) * span, -h, -sway],
-                ]
-            )
-            shade = 0.8 - 0.2 * (i / (slices - 1))
-            colors.extend([[1.0, 0.65, 0.4 * shade], [1.0, 0.6, 0.45 * shade]])
-
-        verts = np.asarray(verts, dtype=np.float32)
-        faces = []
-        for i in range(0, len(verts) - 2, 2):
-            faces.append([offset + i, offset + i + 1, offset + i + 2])
-            faces.append([offset + i + 1, offset + i + 3, offset + i + 2])
-
-        faces = np.asarray(faces, dtype=np.int32)
-        colors = np.asarray(colors, dtype=np.float32)
+        k = np.arange(slices) / (slices - 1)
+        sway = np.sin(k * np.pi) * 0.08
+        x = self.body_length * 0.35 + k * span
+
+        # 上下 2 頂点ずつのリボン。偶数行が上側、奇数行が下側
+        verts = np.empty((2 * slices, 3), dtype=np.float32)
+        verts[0::2] = np.stack([x, heights, sway], axis=-1)
+        verts[1::2] = np.stack([x, -heights, -sway], axis=-1)
+
+        shade = 0.8 - 0.2 * k
+        colors = np.empty((2 * slices, 3), dtype=np.float32)
+        colors[0::2] = np.stack([np.ones(slices), np.full(slices, 0.65), 0.4 * shade], axis=-1)
+        colors[1::2] = np.stack([np.ones(slices), np.full(slices, 0.6), 0.45 * shade], axis=-1)
+
+        i = offset + np.arange(0, 2 * slices - 2, 2)[:, None]
+        faces = np.stack([i + [0, 1, 2], i + [1, 3, 2]], axis=1).reshape(-1, 3).astype(np.int32)
         return verts, faces, colors
 
     def _build_fins(self, offset: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
@@ -200,22 +185,19 @@ class GoldfishModel:
         }
 
 
-def _hsv_to_rgb(h: float, s: float, v: float) -> Tuple[float, float, float]:
-    h = h % 1.0
-    i = int(h * 6)
+def _hsv_to_rgb(h: np.ndarray, s: float | np.ndarray, v: np.ndarray) -> np.ndarray:
+    """HSV をまとめて RGB に変換する（戻り値は shape (..., 3)）。"""
+    h = np.asarray(h, dtype=np.float64) % 1.0
+    s = np.asarray(s, dtype=np.float64)
+    v = np.asarray(v, dtype=np.float64)
+    i = (h * 6).astype(np.int32)
     f = h * 6 - i
     p = v * (1 - s)
     q = v * (1 - f * s)
     t = v * (1 - (1 - f) * s)
     i = i % 6
-    if i == 0:
-        return v, t, p
-    if i == 1:
-        return q, v, p
-    if i == 2:
-        return p, v, t
-    if i == 3:
-        return p, q, v
-    if i == 4:
-        return t, p, v
-    return v, p, q
+    conditions = [i == k for k in range(6)]
+    r = np.select(conditions, [v, q, p, p, t, v])
+    g = np.select(conditions, [t, v, v, q, p, p])
+    b = np.select(conditions, [p, p, t, v, v, q])
+    return np.stack([r, g, b], axis=-1)
@@ -3,7 +3,6 @@ from __future__ import annotations
 
 import math
 import random
-from dataclasses import dataclass
 from typing import Iterable, List, Tuple
 
 import numpy as np
@@ -11,18 +10,12 @@ from matplotlib import pyplot as plt
 from matplotlib.animation import FuncAnimation
 from mpl_toolkits.mplot3d.art3d import Poly3DCollection
 
-from .model import GoldfishModel
-
+try:  # SciPy は任意。無ければ NumPy で同じ回転行列を組み立てる
+    from scipy.spatial.transform import Rotation
+except ImportError:  # pragma: no cover - 環境依存
+    Rotation = None
 
-@dataclass
-class FishState:
-    position: np.ndarray  # shape (3,)
-    velocity: np.ndarray  # shape (3,)
-    yaw: float
-    pitch: float
-    roll: float
-    swim_phase: float
-    scale: float
+from .model import GoldfishModel
 
 
 class AquariumSimulation:
@@ -41,89 +34,95 @@ class AquariumSimulation:
         self.tank_size = np.array(tank_size, dtype=np.float32)
         self.model = GoldfishModel()
         self.mesh = self.model.build()
-        self.fish: List[FishState] = []
+        # 尾びれ・胸びれのアニメーション対象はメッシュだけで決まるので一度だけ求める
+        base = self.mesh.vertices
+        tail_start = self.model.body_length * 0.2
+        self._tail_mask = base[:, 0] > tail_start
+        self._tail_lever = base[self._tail_mask, 0] - tail_start
+        self._fin_mask = (base[:, 0] < -self.model.body_length * 0.1) & (
+            np.abs(base[:, 2]) > self.model.body_radius * 0.5
+        )
+        self._fin_sign = np.sign(base[self._fin_mask, 1])
         self.time = 0.0
         self._init_school(fish_count)
 
     # ------------------------------------------------------------------
     def _init_school(self, fish_count: int) -> None:
-        for _ in range(fish_count):
-            position = (np.random.rand(3) - 0.5) * self.tank_size * np.array([1.0, 0.8, 0.8])
-            velocity = (np.random.rand(3) - 0.5) * np.array([0.3, 0.18, 0.24])
-            yaw = math.atan2(velocity[2], velocity[0])
-            pitch = -math.atan2(velocity[1], max(1e-5, np.linalg.norm(velocity[[0, 2]])))
-            state = FishState(
-                position=position,
-                velocity=velocity,
-                yaw=yaw,
-                pitch=pitch,
-                roll=0.0,
-                swim_phase=random.random() * math.tau,
-                scale=0.65 + random.random() * 0.4,
-            )
-            self.fish.append(state)
+        # 金魚ごとの状態は列ごとの配列（SoA）で持つ。
+        # 乱数は従来の1匹ずつの生成と同じ順序で引き、同じシードなら同じ群れになる
+        draws = np.random.rand(fish_count, 6)
+        extras = np.array([random.random() for _ in range(fish_count * 2)]).reshape(fish_count, 2)
+        self.positions = (draws[:, :3] - 0.5) * self.tank_size * np.array([1.0, 0.8, 0.8])
+        self.velocities = (draws[:, 3:] - 0.5) * np.array([0.3, 0.18, 0.24])
+        self.rolls = np.zeros(fish_count)
+        self.swim_phases = extras[:, 0] * math.tau
+        self.scales = 0.65 + extras[:, 1] * 0.4
+        self._update_attitude()
+
+    def _update_attitude(self) -> None:
+        vel = self.velocities
+        self.yaws = np.arctan2(vel[:, 2], vel[:, 0])
+        self.pitches = -np.arctan2(vel[:, 1], np.maximum(1e-5, np.hypot(vel[:, 0], vel[:, 2])))
+
+    @property
+    def fish_count(self) -> int:
+        return len(self.positions)
 
     # ------------------------------------------------------------------
     def step(self, dt: float = 1 / 24) -> None:
         bounds = self.tank_size / 2
-        for fish in self.fish:
-            desired = self._wander_force(fish)
-            fish.velocity += desired * dt
-            speed = np.linalg.norm(fish.velocity)
-            speed = np.clip(speed, 0.05, 0.35)
-            fish.velocity = (fish.velocity / (speed + 1e-6)) * speed
-
-            fish.position += fish.velocity * dt
-
-            for axis in range(3):
-                limit = bounds[axis]
-                if fish.position[axis] > limit:
-                    fish.position[axis] = limit
-                    fish.velocity[axis] *= -0.85
-                elif fish.position[axis] < -limit:
-                    fish.position[axis] = -limit
-                    fish.velocity[axis] *= -0.85
-
-            fish.yaw = math.atan2(fish.velocity[2], fish.velocity[0])
-            fish.pitch = -math.atan2(
-                fish.velocity[1], max(1e-5, np.linalg.norm(fish.velocity[[0, 2]]))
-            )
-            fish.roll = math.sin(self.time * 0.6 + fish.swim_phase) * 0.1
-            fish.swim_phase = (fish.swim_phase + dt * 4.0) % math.tau
+        desired = self._wander_force()
+        self.velocities += desired * dt
+        speed = np.clip(np.linalg.norm(self.velocities, axis=1), 0.05, 0.35)
+        self.velocities *= (speed / (speed + 1e-6))[:, None]
+
+        self.positions += self.velocities * dt
+
+        # 壁に当たった軸だけ位置を戻し、速度を反転・減衰
+        outside = np.abs(self.positions) > bounds
+        np.clip(self.positions, -bounds, bounds, out=self.positions)
+        self.velocities[outside] *= -0.85
+
+        self._update_attitude()
+        self.rolls = np.sin(self.time * 0.6 + self.swim_phases) * 0.1
+        self.swim_phases = (self.swim_phases + dt * 4.0) % math.tau
 
         self.time += dt
 
     # ------------------------------------------------------------------
-    def _wander_force(self, fish: FishState) -> np.ndarray:
+    def _wander_force(self) -> np.ndarray:
         # ノイズベクトル
-        jitter = (np.random.rand(3) - 0.5) * np.array([0.12, 0.08, 0.1])
+        jitter = (np.random.rand(self.fish_count, 3) - 0.5) * np.array([0.12, 0.08, 0.1])
         # 領域中心へ戻す力
-        center_force = -fish.position * 0.3
+        center_force = -self.positions * 0.3
         # 高さ方向はゆっくり揺らす
-        vertical = math.sin(self.time * 0.3 + fish.swim_phase) * 0.06 - fish.position[1] * 0.12
-        return center_force + jitter + np.array([0.0, vertical, 0.0])
+        vertical = np.sin(self.time * 0.3 + self.swim_phases) * 0.06 - self.positions[:, 1] * 0.12
+        force = center_force + jitter
+        force[:, 1] += vertical
+        return force
 
     # ------------------------------------------------------------------
     def transformed_meshes(self) -> Iterable[Tuple[np.ndarray, np.ndarray]]:
+        if not self.fish_count:
+            return
         base = self.mesh.vertices
-        for fish in self.fish:
-            rot = _rotation_matrix(fish.yaw, fish.pitch, fish.roll)
-            scaled = base * fish.scale
-            deformed = scaled.copy()
+        phase = self.swim_phases
+
+        # 全個体分を (F, V, 3) でまとめて変形する
+        deformed = base[None, :, :] * self.scales.astype(np.float32)[:, None, None]
 
-            # 尾びれを左右に振る簡易アニメーション
-            tail_mask = base[:, 0] > self.model.body_length * 0.2
-            tail_offset = np.sin(self.time * 3.2 + fish.swim_phase) * 0.15
-            deformed[tail_mask, 2] += (base[tail_mask, 0] - self.model.body_length * 0.2) * tail_offset
+        # 尾びれを左右に振る簡易アニメーション
+        tail_offset = np.sin(self.time * 3.2 + phase) * 0.15
+        deformed[:, self._tail_mask, 2] += self._tail_lever[None, :] * tail_offset[:, None]
 
-            # 胸びれの開閉
-            fin_mask = (base[:, 0] < -self.model.body_length * 0.1) & (np.abs(base[:, 2]) > self.model.body_radius * 0.5)
-            fin_wave = np.sin(self.time * 5.0 + fish.swim_phase)
-            deformed[fin_mask, 1] += 0.08 * fin_wave * np.sign(base[fin_mask, 1])
+        # 胸びれの開閉
+        fin_wave = np.sin(self.time * 5.0 + phase)
+        deformed[:, self._fin_mask, 1] += 0.08 * fin_wave[:, None] * self._fin_sign[None, :]
 
-            rotated = deformed @ rot.T
-            translated = rotated + fish.position
-            yield translated, self.mesh.faces
+        rot = _rotation_matrices(self.yaws, self.pitches, self.rolls)
+        world = np.einsum("fvj,fkj->fvk", deformed, rot) + self.positions[:, None, :]
+        for verts in world:
+            yield verts, self.mesh.faces
 
     # ------------------------------------------------------------------
     def run(self, seconds: float = 30.0, fps: int = 24) -> None:
@@ -142,29 +141,26 @@ class AquariumSimulation:
         mesh_collections: List[Poly3DCollection] = []
 
         def init_plot() -> List[Poly3DCollection]:
-            while mesh_collections:
-                mesh_collections.pop().remove()
+            # コレクションは金魚ごとに一度だけ作り、以降は頂点だけを差し替える
+            if mesh_collections:
+                return update_verts()
             for verts, faces in self.transformed_meshes():
-                tris = [verts[face] for face in faces]
-                poly = Poly3DCollection(tris, linewidths=0.1, alpha=0.92)
+                poly = Poly3DCollection(verts[faces], linewidths=0.1, alpha=0.92)
                 poly.set_facecolor((1.0, 0.58, 0.4, 0.92))
                 poly.set_edgecolor((0.1, 0.1, 0.1, 0.3))
                 mesh_collections.append(poly)
                 ax.add_collection3d(poly)
             return mesh_collections
 
+        def update_verts() -> List[Poly3DCollection]:
+            for poly, (verts, faces) in zip(mesh_collections, self.transformed_meshes()):
+                # (M, 3, 3) の三角形配列を一度のファンシーインデックスで取り出す
+                poly.set_verts(verts[faces])
+            return mesh_collections
+
         def update(_frame: int) -> List[Poly3DCollection]:
             self.step(1.0 / fps)
-            while mesh_collections:
-                mesh_collections.pop().remove()
-            for verts, faces in self.transformed_meshes():
-                tris = [verts[face] for face in faces]
-                poly = Poly3DCollection(tris, linewidths=0.1, alpha=0.92)
-                poly.set_facecolor((1.0, 0.58, 0.4, 0.92))
-                poly.set_edgecolor((0.1, 0.1, 0.1, 0.3))
-                mesh_collections.append(poly)
-                ax.add_collection3d(poly)
-            return mesh_collections
+            return update_verts()
 
         frame_total = int(seconds * fps)
         anim = FuncAnimation(
@@ -183,12 +179,19 @@ class AquariumSimulation:
         self.model.export_obj(destination)
 
 
-def _rotation_matrix(yaw: float, pitch: float, roll: float) -> np.ndarray:
-    cy, sy = math.cos(yaw), math.sin(yaw)
-    cp, sp = math.cos(pitch), math.sin(pitch)
-    cr, sr = math.cos(roll), math.sin(roll)
+def _rotation_matrices(yaw: np.ndarray, pitch: np.ndarray, roll: np.ndarray) -> np.ndarray:
+    """yaw(Y軸) → pitch(X軸) → roll(Z軸) の合成回転を (F, 3, 3) でまとめて返す。"""
+    if Rotation is not None:
+        # 大文字 "YXZ" は内因性回転で、Ry @ Rx @ Rz と同じ行列になる
+        return Rotation.from_euler("YXZ", np.stack([yaw, pitch, roll], axis=1)).as_matrix()
+
+    cy, sy = np.cos(yaw), np.sin(yaw)
+    cp, sp = np.cos(pitch), np.sin(pitch)
+    cr, sr = np.cos(roll), np.sin(roll)
+    zero = np.zeros_like(yaw)
+    one = np.ones_like(yaw)
 
-    rot_yaw = np.array([[cy, 0, sy], [0, 1, 0], [-sy, 0, cy]])
-    rot_pitch = np.array([[1, 0, 0], [0, cp, -sp], [0, sp, cp]])
-    rot_roll = np.array([[cr, -sr, 0], [sr, cr, 0], [0, 0, 1]])
+    rot_yaw = np.stack([cy, zero, sy, zero, one, zero, -sy, zero, cy], axis=-1).reshape(-1, 3, 3)
+    rot_pitch = np.stack([one, zero, zero, zero, cp, -sp, zero, sp, cp], axis=-1).reshape(-1, 3, 3)
+    rot_roll = np.stack([cr, -sr, zero, sr, cr, zero, zero, zero, one], axis=-1).reshape(-1, 3, 3)
     return rot_yaw @ rot_pitch @ rot_roll
@@ -351,14 +351,82 @@
   }
 
   // WebSocket接続
+  // 既定はバイナリ形式。ページURLに ?format=json を付けると JSON で受信する
   const wsProto = location.protocol === 'https:' ? 'wss' : 'ws';
-  const ws = new WebSocket(`${wsProto}://${location.host}/ws`);
+  const wsFormat = new URLSearchParams(location.search).get('format') === 'json' ? 'json' : 'binary';
+  const ws = new WebSocket(`${wsProto}://${location.host}/ws?format=${wsFormat}`);
+  ws.binaryType = 'arraybuffer';
+  const textDecoder = new TextDecoder();
+
+  // ヘッダ: "STAT" + uint8 版数 + uint8 1匹あたりの値の数 + uint16 匹数  … 8バイト
+  // 本体: 1匹あたり float16 × 13 = [x, y, z, vx, vy, vz, dir, speed, scale, hx, hy, hz, flip]（リトルエンディアン）、id は行番号
+  const STATE_HEADER_BYTES = 8;
+  const STATE_VERSION = 2;
+
+  // 半精度(float16)のビット列を number に戻す
+  function f16ToF32(h) {
+    const sign = h & 0x8000 ? -1 : 1;
+    const exp = (h >> 10) & 0x1f;
+    const frac = h & 0x3ff;
+    if (exp === 0) return sign * frac * 2 ** -24;
+    if (exp === 0x1f) return frac ? NaN : sign * Infinity;
+    return sign * (1 + frac / 1024) * 2 ** (exp - 15);
+  }
+
+  function readHalfFloats(buf, offset, length) {
+    if (typeof Float16Array !== 'undefined') return new Float16Array(buf, offset, length);
+    const bits = new Uint16Array(buf, offset, length);
+    const out = new Float32Array(length);
+    for (let i = 0; i < length; i++) out[i] = f16ToF32(bits[i]);
+    return out;
+  }
+
+  function decodeBinaryState(buf) {
+    const view = new DataView(buf);
+    const magic = String.fromCharCode(view.getUint8(0), view.getUint8(1), view.getUint8(2), view.getUint8(3));
+    if (magic !== 'STAT' || view.getUint8(4) !== STATE_VERSION) return null;
+    const fields = view.getUint8(5);
+    const count = view.getUint16(6, true);
+    const values = readHalfFloats(buf, STATE_HEADER_BYTES, count * fields);
+    const fish = new Array(count);
+    for (let i = 0; i < count; i++) {
+      const o = i * fields;
+      fish[i] = {
+        id: i,
+        x: values[o], y: values[o + 1], z: values[o + 2],
+        vx: values[o + 3], vy: values[o + 4], vz: values[o + 5],
+        dir: values[o + 6], speed: values[o + 7], scale: values[o + 8],
+        heading: { x: values[o + 9], y: values[o + 10], z: values[o + 11] },
+        flip: values[o + 12],
+      };
+    }
+    return fish;
+  }
+
   scheduleFallback();
   ws.onmessage = (ev) => {
     try {
-      const msg = JSON.parse(ev.data);
+      if (typeof ev.data !== 'string' && wsFormat === 'binary') {
+        const fish = decodeBinaryState(ev.data);
+        if (fish) {
+          fishState = fish;
+          syncThreeFish();
+        }
+        return;
+      }
+      const text = typeof ev.data === 'string' ? ev.data : textDecoder.decode(ev.data);
+      const msg = JSON.parse(text);
       if (msg.type === 'state') {
-        fishState = msg.fish || [];
+        // JSON は列指向（ids, x, y, dir, ... がそれぞれ配列）
+        const ids = msg.ids || [];
+        const fish = new Array(ids.length);
+        for (let i = 0; i < ids.length; i++) {
+          fish[i] = {
+            id: ids[i], x: msg.x[i], y: msg.y[i], dir: msg.dir[i],
+            scale: msg.scale[i], flip: msg.flip[i],
+          };
+        }
+        fishState = fish;
         syncThreeFish();
       }
     } catch (e) {}
@@ -0,0 +1,94 @@
+import importlib
+import os
+import sys
+import threading
+import time
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def _import_main():
+    # main.py は static/ をカレントディレクトリからの相対パスで読むので、リポジトリ直下で import する
+    sys.path.insert(0, str(ROOT))
+    cwd = os.getcwd()
+    os.chdir(ROOT)
+    try:
+        return importlib.import_module("main")
+    finally:
+        os.chdir(cwd)
+
+
+main = _import_main()
+
+
+class TankEncodeTest(unittest.TestCase):
+    def test_encode_waits_for_step_in_progress(self):
+        tank = main.Tank(8, rng=np.random.default_rng(0), groups=1)
+        entered = threading.Event()
+        release = threading.Event()
+        advance = tank._advance
+
+        def slow_advance(rows, dt):
+            # 位置だけ書き換えた途中の状態で止め、その間に別スレッドから encode させる
+            tank.pos[rows] += 0.25
+            entered.set()
+            release.wait(5)
+            tank.pos[rows] -= 0.25
+            advance(rows, dt)
+
+        tank._advance = slow_advance
+        stepper = threading.Thread(target=tank.step, args=(0.05,))
+        stepper.start()
+        self.assertTrue(entered.wait(5))
+
+        frames = []
+        encoder = threading.Thread(target=lambda: frames.append(tank.encode("binary")))
+        encoder.start()
+        time.sleep(0.05)
+        self.assertTrue(encoder.is_alive(), "encode must not read a tick that is still being stepped")
+
+        release.set()
+        stepper.join(5)
+        encoder.join(5)
+        self.assertEqual(frames, [tank._encode("binary")])
+        self.assertIs(tank.encode("binary"), frames[0])
+
+
+class TankGroupsTest(unittest.TestCase):
+    def _heading_spread(self, groups, use_kernel):
+        kernel = main._step_kernel
+        if not use_kernel:
+            main._step_kernel = None
+        try:
+            tank = main.Tank(6000, rng=np.random.default_rng(1), groups=groups)
+            # 壁と中心回帰の影響が出ないよう、中央からゆっくり泳がせる
+            tank.pos[:] = 0.5
+            tank.speed[:] = main.SPEED_MIN
+            start = tank.dir.copy()
+            for _ in range(20):
+                tank.step(0.05)
+        finally:
+            main._step_kernel = kernel
+        cos = np.clip(np.einsum("ij,ij->i", start, tank.dir), -1.0, 1.0)
+        return float(np.mean(np.arccos(cos) ** 2))
+
+    def _check_groups_keep_turn_noise(self, use_kernel):
+        single = self._heading_spread(1, use_kernel)
+        grouped = self._heading_spread(2, use_kernel)
+        self.assertGreater(grouped / single, 0.85)
+        self.assertLess(grouped / single, 1.15)
+
+    def test_groups_keep_turn_noise_numpy(self):
+        self._check_groups_keep_turn_noise(use_kernel=False)
+
+    @unittest.skipIf(main._step_kernel is None, "numba is not installed")
+    def test_groups_keep_turn_noise_numba(self):
+        self._check_groups_keep_turn_noise(use_kernel=True)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,14 +1,24 @@
 #!/usr/bin/env python3
 """Detect whether the current branch merges cleanly with a target branch.
 
-This helper spins up a temporary detached worktree at the current HEAD and
-attempts a `git merge --no-commit --no-ff` against the requested branch
-(defaults to ``origin/master``).  If Git reports conflicts the script will
-surface that fact and exit with a non-zero status so it can be used inside
-CI workflows or pre-push hooks.
-
-The script never touches the caller's working tree: any temporary worktree is
-discarded once the check completes, regardless of the merge outcome.
+This helper performs an in-memory three-way merge of the current HEAD with the
+requested branch (defaults to ``origin/master``) using ``git merge-tree
+--write-tree``.  If Git reports conflicts the script will surface that fact and
+exit with a non-zero status so it can be used inside CI workflows or pre-push
+hooks.
+
+Git older than 2.38 lacks ``merge-tree --write-tree``; there the script spins up
+a temporary detached worktree at HEAD and attempts a ``git merge --no-commit
+--no-ff`` instead.  Either way the caller's working tree is never touched: any
+temporary worktree is discarded once the check completes, regardless of the
+merge outcome.
+
+Only the target ref is fetched, without tags. When the remote is already a
+partial-clone promisor (``remote.<name>.promisor``), the fetch is blob-less
+(``--filter=blob:none``) and blobs the merge needs are fetched on demand. Other
+remotes get a plain fetch, because a filtered fetch would turn them into
+promisors and make every later fetch of that remote blob-less too. If the server
+rejects the filter the script falls back to a plain fetch of the same ref.
 """
 
 from __future__ import annotations
@@ -71,36 +81,32 @@ def ensure_remote_available(target: str, repo: Path) -> tuple[str, str]:
     return remote, remainder
 
 
-def main(argv: list[str]) -> int:
-    parser = argparse.ArgumentParser(description="Check whether the current branch merges cleanly with a target ref.")
-    parser.add_argument(
-        "target",
-        nargs="?",
-        default="origin/master",
-        help="検証したいターゲットブランチ（デフォルト: origin/master）",
-    )
-    args = parser.parse_args(argv)
+def merge_in_memory(full_target: str, repo: Path) -> int | None:
+    """Trial-merge HEAD with ``full_target`` via ``git merge-tree --write-tree``.
 
-    repo = Path(__file__).resolve().parents[1]
+    Returns the exit status to report, or ``None`` when this Git does not
+    support ``--write-tree`` and the worktree fallback has to be used.
+    """
 
-    try:
-        remote, remote_ref = ensure_remote_available(args.target, repo)
-    except RuntimeError as exc:
-        print(exc)
-        return 2
+    merge = run_git(["merge-tree", "--write-tree", "--name-only", "HEAD", full_target], repo, check=False)
+    if merge.returncode == 0:
+        print(f"{full_target} とのマージは自動解決可能です。")
+        return 0
+    if merge.returncode != 1:
+        # 2.38 より古い Git は --write-tree を知らない（usage エラー）
+        return None
 
-    fetch = run_git(["fetch", remote], repo, check=False)
-    if fetch.returncode != 0:
-        print("リモートからの fetch に失敗しました:")
-        if fetch.stderr:
-            print(fetch.stderr.strip())
-        return fetch.returncode
+    print(f"{full_target} とのマージでコンフリクトが発生しました。出力を確認してください。")
+    # 出力は「結果のツリー」「コンフリクトしたパス」「空行」「メッセージ」の順
+    _tree, _, details = merge.stdout.partition("\n")
+    output = details.strip()
+    if output:
+        print(output)
+    return 1
 
-    full_target = f"{remote}/{remote_ref}"
-    verify = run_git(["rev-parse", "--verify", full_target], repo, check=False)
-    if verify.returncode != 0:
-        print(f"{full_target} が確認できませんでした。ブランチ名を見直してください。")
-        return verify.returncode
+
+def merge_in_worktree(full_target: str, repo: Path) -> int:
+    """Trial-merge HEAD with ``full_target`` in a temporary detached worktree."""
 
     tmpdir = Path(tempfile.mkdtemp(prefix="merge-check-"))
 
@@ -136,5 +142,56 @@ def main(argv: list[str]) -> int:
         shutil.rmtree(tmpdir, ignore_errors=True)
 
 
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(description="Check whether the current branch merges cleanly with a target ref.")
+    parser.add_argument(
+        "target",
+        nargs="?",
+        default="origin/master",
+        help="検証したいターゲットブランチ（デフォルト: origin/master）",
+    )
+    args = parser.parse_args(argv)
+
+    repo = Path(__file__).resolve().parents[1]
+
+    try:
+        remote, remote_ref = ensure_remote_available(args.target, repo)
+    except RuntimeError as exc:
+        print(exc)
+        return 2
+
+    # blob-less fetch は既に partial clone のリモートに限る。そうでないリモートに使うと
+    # promisor として .git/config に記録され、以後の通常の fetch まで blob-less になってしまう
+    promisor = run_git(["config", "--bool", "--get", f"remote.{remote}.promisor"], repo, check=False)
+    fetch = None
+    if promisor.stdout.strip() == "true":
+        fetch = run_git(["fetch", "--filter=blob:none", "--no-tags", remote, remote_ref], repo, check=False)
+    if fetch is None or fetch.returncode != 0:
+        # 通常のリモート、または partial clone に対応していないリモートでは通常の fetch を行う
+        fetch = run_git(["fetch", "--no-tags", remote, remote_ref], repo, check=False)
+    if fetch.returncode != 0:
+        print("リモートからの fetch に失敗しました:")
+        if fetch.stderr:
+            print(fetch.stderr.strip())
+        return fetch.returncode
+
+    full_target = f"{remote}/{remote_ref}"
+    verify = run_git(["rev-parse", "--verify", full_target], repo, check=False)
+    if verify.returncode != 0:
+        print(f"{full_target} が確認できませんでした。ブランチ名を見直してください。")
+        return verify.returncode
+
+    # どちらかが祖先（fast-forward か取り込み済み）ならマージは自明にクリーンなので、試しマージ自体を省く
+    for ancestor, descendant in (("HEAD", full_target), (full_target, "HEAD")):
+        if run_git(["merge-base", "--is-ancestor", ancestor, descendant], repo, check=False).returncode == 0:
+            print(f"{full_target} とのマージは自動解決可能です。")
+            return 0
+
+    result = merge_in_memory(full_target, repo)
+    if result is None:
+        result = merge_in_worktree(full_target, repo)
+    return result
+
+
 if __name__ == "__main__":
     sys.exit(main(sys.argv[1:]))
@@ -5,300 +5,550 @@ fan tail, dorsal fin, pectoral fins, and pelvic fin. The geometry is analytic an
 kept small enough to ship with the repository, while still providing enough detail
 for smooth shading and subtle animation in the WebGL viewer.
 
-Run directly to overwrite ``static/models/goldfish.gltf``.
+Run directly to overwrite ``static/models/goldfish.gltf``. The JSON is written
+compactly; pass ``--indent 2`` for a human-readable file. An output path ending in
+``.glb`` writes binary glTF with the mesh buffer stored raw instead of base64.
+Generation is skipped when a ``<output>.stamp`` file shows the existing output was
+produced by this exact script and settings; pass ``--force`` to rebuild anyway.
+``--external-buffer`` writes the buffer to a sibling ``.bin`` file referenced by
+URI instead of embedding it as base64.
+Attributes are quantised via ``KHR_mesh_quantization``: positions and UVs to
+normalized uint16, normals to normalized int16, with the position dequantisation
+folded into the node transforms; ``--no-quantize`` keeps float32.
+``--detail`` scales every grid resolution, e.g. ``--detail 0.5`` for a low-detail
+variant. It must be positive, and any value other than 1 needs an explicit output
+path so the shipped ``static/models/goldfish.gltf`` is never replaced by it.
 """
 from __future__ import annotations
 
+import argparse
 import base64
+import contextlib
+import functools
+import hashlib
 import json
 import math
+import os
 import struct
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Callable, Iterable, List, Sequence, Tuple
+from types import MappingProxyType
+from typing import BinaryIO, Callable, Dict, Iterable, Iterator, List, Sequence, Tuple
 
-Vec3 = Tuple[float, float, float]
+import numpy as np
+
+try:  # orjson is optional; the standard library encoder is used when it is missing.
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+# Surface functions take parameter arrays and return one array per coordinate.
+Vec3Field = Tuple[np.ndarray, np.ndarray, np.ndarray]
+
+# Number of components per element for each glTF accessor type.
+_COMPONENTS = MappingProxyType({"SCALAR": 1, "VEC2": 2, "VEC3": 3, "VEC4": 4})
+
+# Little-endian NumPy dtype for each glTF accessor componentType.
+_COMPONENT_DTYPES = MappingProxyType(
+    {5120: "i1", 5121: "u1", 5122: "<i2", 5123: "<u2", 5125: "<u4", 5126: "<f4"}
+)
 
 
 @dataclass
 class AttributeBundle:
-    position: List[float]
-    normal: List[float]
-    uv: List[float]
-    indices: List[int]
+    """Vertex attributes as contiguous little-endian float32 rows, ready to pack."""
+
+    position: np.ndarray  # (N, 3)
+    normal: np.ndarray  # (N, 3)
+    uv: np.ndarray  # (N, 2)
+    indices: np.ndarray
+
+
+@functools.lru_cache(maxsize=None)
+def _grid_indices(u_count: int, v_count: int, wrap_u: bool = False) -> np.ndarray:
+    """Triangle indices for a ``(v_count + 1) x (u_count + 1)`` vertex grid, two per quad.
+
+    With ``wrap_u`` each row holds only ``u_count`` vertices and the last quad of
+    a row closes back onto its first vertex.
+    """
+
+    stride = u_count if wrap_u else u_count + 1
+    rows = np.arange(v_count)[:, None] * stride
+    columns = np.arange(u_count)
+    a = (rows + columns).ravel()
+    d = (rows + (columns + 1) % stride).ravel()
+    b = a + stride
+    c = d + stride
+    # 65535 is reserved for primitive restart in 16-bit index buffers.
+    vertex_count = (v_count + 1) * stride
+    indices = np.stack([a, b, d, b, c, d], axis=1).ravel().astype("<u2" if vertex_count <= 65535 else "<u4")
+    # The array is shared between callers through the cache.
+    indices.flags.writeable = False
+    return indices
+
+
+def _vertex_rows(values: np.ndarray) -> np.ndarray:
+    """Flatten a grid of vertex attributes to contiguous ``(N, comps)`` float32 rows."""
+
+    return np.ascontiguousarray(values.reshape(-1, values.shape[-1]), dtype="<f4")
 
 
 def lerp(a: float, b: float, t: float) -> float:
     return a + (b - a) * t
 
 
-def profile_radius(s: float) -> float:
-    head = math.exp(-((s - 0.1) / 0.25) ** 2) * 0.06
-    mid = math.exp(-((s - 0.45) / 0.32) ** 2) * 0.18
-    tail = math.exp(-((s - 0.85) / 0.18) ** 2) * 0.06
+def profile_radius(s: float | np.ndarray) -> float | np.ndarray:
+    head = np.exp(-((s - 0.1) / 0.25) ** 2) * 0.06
+    mid = np.exp(-((s - 0.45) / 0.32) ** 2) * 0.18
+    tail = np.exp(-((s - 0.85) / 0.18) ** 2) * 0.06
     return head + mid + tail + 0.02
 
 
-def build_body() -> AttributeBundle:
-    segments_len = 40
-    segments_rad = 32
-    positions: List[float] = []
-    normals: List[float] = []
-    uvs: List[float] = []
+def profile_radius_and_derivative(s: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """:func:`profile_radius` and its exact derivative from one set of exponentials.
+
+    Each gaussian contributes ``-2 (s - mu) / sigma^2`` times itself to the derivative.
+    """
+
+    head = np.exp(-((s - 0.1) / 0.25) ** 2) * 0.06
+    mid = np.exp(-((s - 0.45) / 0.32) ** 2) * 0.18
+    tail = np.exp(-((s - 0.85) / 0.18) ** 2) * 0.06
+    r = head + mid + tail + 0.02
+    dr = head * (-2.0 * (s - 0.1) / 0.25**2) + mid * (-2.0 * (s - 0.45) / 0.32**2) + tail * (-2.0 * (s - 0.85) / 0.18**2)
+    return r, dr
+
+
+def lod_count(count: int, detail: float) -> int:
+    """Scale a grid resolution by ``detail``, keeping at least three segments."""
+
+    if not (math.isfinite(detail) and detail > 0):
+        raise ValueError(f"detail must be a positive finite number, got {detail!r}")
+    return max(3, round(count * detail))
+
+
+def build_body(detail: float = 1.0) -> AttributeBundle:
+    segments_len = lod_count(40, detail)
+    segments_rad = lod_count(32, detail)
 
     length = 0.35 - (-0.55)
 
-    for j in range(segments_len + 1):
-        s = j / segments_len
-        x = lerp(-0.55, 0.35, s)
-        r = profile_radius(s)
-        ds = 1.0 / segments_len
-        r_prev = profile_radius(max(0.0, s - ds))
-        r_next = profile_radius(min(1.0, s + ds))
-        dr = (r_next - r_prev) / (2 * ds)
-        dx_ds = length
-
-        for i in range(segments_rad + 1):
-            t = i / segments_rad
-            theta = t * math.tau
-            y = math.cos(theta) * r
-            z = math.sin(theta) * r
-            positions.extend((x, y, z))
-
-            dy_dt = -math.sin(theta) * r * math.tau
-            dz_dt = math.cos(theta) * r * math.tau
-            dy_ds = math.cos(theta) * dr
-            dz_ds = math.sin(theta) * dr
-            tangent_s = (dx_ds, dy_ds, dz_ds)
-            tangent_t = (0.0, dy_dt, dz_dt)
-
-            nx = tangent_t[1] * tangent_s[2] - tangent_t[2] * tangent_s[1]
-            ny = tangent_t[2] * tangent_s[0] - tangent_t[0] * tangent_s[2]
-            nz = tangent_t[0] * tangent_s[1] - tangent_t[1] * tangent_s[0]
-            length_n = math.sqrt(nx * nx + ny * ny + nz * nz) or 1.0
-            normals.extend((nx / length_n, ny / length_n, nz / length_n))
-            uvs.extend((s, t))
-
-    indices: List[int] = []
-    stride = segments_rad + 1
-    for j in range(segments_len):
-        for i in range(segments_rad):
-            a = j * stride + i
-            b = a + stride
-            c = b + 1
-            d = a + 1
-            indices.extend((a, b, d))
-            indices.extend((b, c, d))
-
-    return AttributeBundle(positions, normals, uvs, indices)
-
-
-def tail_point(u: float, v: float) -> Vec3:
+    # Rings run along axis 0 and the angle around the body along axis 1.
+    s = np.arange(segments_len + 1) / segments_len
+    # The ring at theta = tau would duplicate theta = 0, so rings wrap instead.
+    t = np.arange(segments_rad) / segments_rad
+    theta = t * math.tau
+    cos_t = np.cos(theta)[None, :]
+    sin_t = np.sin(theta)[None, :]
+
+    x = lerp(-0.55, 0.35, s)
+    r, dr = profile_radius_and_derivative(s)
+    r = r[:, None]
+    dr = dr[:, None]
+
+    grid = (segments_len + 1, segments_rad)
+    positions = np.stack([np.broadcast_to(x[:, None], grid), cos_t * r, sin_t * r], axis=-1)
+
+    # For a surface of revolution the cross product of the ring and profile
+    # tangents reduces to (-dr, length cos, length sin), scaled by r * tau.
+    inv_norm = 1.0 / np.sqrt(dr * dr + length * length)
+    radial = length * inv_norm
+    normals = np.stack([np.broadcast_to(-dr * inv_norm, grid), cos_t * radial, sin_t * radial], axis=-1)
+
+    uvs = np.stack(np.meshgrid(s, t, indexing="ij"), axis=-1)
+
+    return AttributeBundle(
+        _vertex_rows(positions),
+        _vertex_rows(normals),
+        _vertex_rows(uvs),
+        _grid_indices(segments_rad, segments_len, wrap_u=True),
+    )
+
+
+def tail_point(u: np.ndarray, v: np.ndarray) -> Vec3Field:
     span = 0.5
     length = 0.65
     x = -0.55 - length * u
     flare = (1 - u) ** 0.4
     y = (v - 0.5) * span * (0.6 + 0.8 * (1 - flare))
     z = (v - 0.5) * span * 1.4 * flare
-    sweep = math.sin(u * math.pi * 0.5) * 0.18
-    z += sweep * (1 - abs(v - 0.5) * 1.8)
+    sweep = np.sin(u * math.pi * 0.5) * 0.18
+    z += sweep * (1 - np.abs(v - 0.5) * 1.8)
     return (x, y * 0.6, z)
 
 
-def build_grid(u_count: int, v_count: int, func: Callable[[float, float], Vec3]) -> AttributeBundle:
-    positions: List[float] = []
-    normals: List[float] = []
-    uvs: List[float] = []
-    indices: List[int] = []
+def _evaluate(func: Callable[[np.ndarray, np.ndarray], Vec3Field], u: np.ndarray, v: np.ndarray) -> np.ndarray:
+    return np.stack(np.broadcast_arrays(*func(u, v)), axis=-1)
+
 
-    def partial(u: float, v: float, axis: int) -> Vec3:
+def build_grid(u_count: int, v_count: int, func: Callable[[np.ndarray, np.ndarray], Vec3Field]) -> AttributeBundle:
+    # Rows follow v and columns follow u, matching the vertex order of the index buffer.
+    u, v = np.meshgrid(np.arange(u_count + 1) / u_count, np.arange(v_count + 1) / v_count)
+    positions = _evaluate(func, u, v)
+
+    def partial(axis: int) -> np.ndarray:
         delta = 1e-3
+        param = u if axis == 0 else v
+        lo = np.maximum(0.0, param - delta)
+        hi = np.minimum(1.0, param + delta)
         if axis == 0:
-            a = func(max(0.0, u - delta), v)
-            b = func(min(1.0, u + delta), v)
-            denom = (min(1.0, u + delta) - max(0.0, u - delta)) or 1e-6
-        else:
-            a = func(u, max(0.0, v - delta))
-            b = func(u, min(1.0, v + delta))
-            denom = (min(1.0, v + delta) - max(0.0, v - delta)) or 1e-6
-        return ((b[0] - a[0]) / denom, (b[1] - a[1]) / denom, (b[2] - a[2]) / denom)
-
-    for j in range(v_count + 1):
-        v = j / v_count
-        for i in range(u_count + 1):
-            u = i / u_count
-            px, py, pz = func(u, v)
-            positions.extend((px, py, pz))
-
-            du = partial(u, v, 0)
-            dv = partial(u, v, 1)
-            nx = du[1] * dv[2] - du[2] * dv[1]
-            ny = du[2] * dv[0] - du[0] * dv[2]
-            nz = du[0] * dv[1] - du[1] * dv[0]
-            length_n = math.sqrt(nx * nx + ny * ny + nz * nz) or 1.0
-            normals.extend((nx / length_n, ny / length_n, nz / length_n))
-            uvs.extend((u, v))
-
-    stride = u_count + 1
-    for j in range(v_count):
-        for i in range(u_count):
-            a = j * stride + i
-            b = a + stride
-            c = b + 1
-            d = a + 1
-            indices.extend((a, b, d))
-            indices.extend((b, c, d))
-
-    return AttributeBundle(positions, normals, uvs, indices)
-
-
-def mirror_positions(data: Sequence[float], axis: str = "z") -> List[float]:
-    mirrored: List[float] = []
-    for i in range(0, len(data), 3):
-        x, y, z = data[i : i + 3]
-        if axis == "z":
-            mirrored.extend((x, y, -z))
-        elif axis == "y":
-            mirrored.extend((x, -y, z))
+            a, b = _evaluate(func, lo, v), _evaluate(func, hi, v)
         else:
-            mirrored.extend((-x, y, z))
-    return mirrored
-
-
-def mirror_normals(data: Sequence[float], axis: str = "z") -> List[float]:
-    return mirror_positions(data, axis)
+            a, b = _evaluate(func, u, lo), _evaluate(func, u, hi)
+        denom = hi - lo
+        return (b - a) / np.where(denom > 0, denom, 1e-6)[..., None]
+
+    normals = np.cross(partial(0), partial(1))
+    length_n = np.linalg.norm(normals, axis=-1, keepdims=True)
+    normals /= np.where(length_n > 0, length_n, 1.0)
+    uvs = np.stack([u, v], axis=-1)
+
+    return AttributeBundle(
+        _vertex_rows(positions),
+        _vertex_rows(normals),
+        _vertex_rows(uvs),
+        _grid_indices(u_count, v_count),
+    )
 
 
-def build_tail() -> AttributeBundle:
-    return build_grid(20, 12, tail_point)
+def build_tail(detail: float = 1.0) -> AttributeBundle:
+    return build_grid(lod_count(20, detail), lod_count(12, detail), tail_point)
 
 
-def build_dorsal() -> AttributeBundle:
-    def dorsal_func(u: float, v: float) -> Vec3:
+def build_dorsal(detail: float = 1.0) -> AttributeBundle:
+    def dorsal_func(u: np.ndarray, v: np.ndarray) -> Vec3Field:
         span = 0.26
         height = 0.24
         x = lerp(-0.18, 0.24, u)
-        y = 0.12 + (1 - (u - 0.1) ** 2 * 1.8) * height * (1 - abs(v - 0.5) * 0.4)
+        y = 0.12 + (1 - (u - 0.1) ** 2 * 1.8) * height * (1 - np.abs(v - 0.5) * 0.4)
         z = (v - 0.5) * span * (0.5 + (1 - u) * 0.3)
         return (x, y, z)
 
-    return build_grid(10, 6, dorsal_func)
+    return build_grid(lod_count(10, detail), lod_count(6, detail), dorsal_func)
 
 
-def build_pectoral_left() -> AttributeBundle:
-    def pectoral_func(u: float, v: float) -> Vec3:
+def build_pectoral_left(detail: float = 1.0) -> AttributeBundle:
+    def pectoral_func(u: np.ndarray, v: np.ndarray) -> Vec3Field:
         spread = 0.22
         x = lerp(0.02, 0.28, u)
-        y = -0.03 + math.sin(u * math.pi) * 0.06 - v * 0.02
+        y = -0.03 + np.sin(u * math.pi) * 0.06 - v * 0.02
         z = 0.12 + (v - 0.5) * spread
-        x += math.sin((v - 0.5) * math.pi) * 0.03
-        y += math.sin(u * math.pi * 0.5) * 0.02
+        x += np.sin((v - 0.5) * math.pi) * 0.03
+        y += np.sin(u * math.pi * 0.5) * 0.02
         return (x, y, z)
 
-    return build_grid(8, 4, pectoral_func)
+    return build_grid(lod_count(8, detail), lod_count(4, detail), pectoral_func)
 
 
-def build_pelvic() -> AttributeBundle:
-    def pelvic_func(u: float, v: float) -> Vec3:
+def build_pelvic(detail: float = 1.0) -> AttributeBundle:
+    def pelvic_func(u: np.ndarray, v: np.ndarray) -> Vec3Field:
         spread = 0.18
         x = lerp(-0.12, 0.1, u)
         y = -0.12 + (1 - u) * -0.04 + (v - 0.5) * 0.01
         z = (v - 0.5) * spread
-        y += math.sin(u * math.pi) * 0.04
+        y += np.sin(u * math.pi) * 0.04
         return (x, y, z)
 
-    return build_grid(6, 4, pelvic_func)
+    return build_grid(lod_count(6, detail), lod_count(4, detail), pelvic_func)
 
 
-def pack_floats(values: Sequence[float]) -> bytes:
-    return struct.pack("<%sf" % len(values), *values)
+def _align4(offset: int) -> int:
+    return (offset + 3) & ~3
 
 
-def pack_indices(values: Sequence[int]) -> bytes:
-    return struct.pack("<%sH" % len(values), *values)
+def quantize_unorm16(values: np.ndarray) -> Tuple[np.ndarray, List[float], List[float]]:
+    """Map the rows onto ``[0, 65535]`` and return the codes with their decode offset and scale.
 
+    The codes are meant for a normalized accessor, so ``offset + scale * code / 65535``
+    recovers the input to within half a step. One scale is shared by every column:
+    the decode is applied as a node transform, and a non-uniform scale there
+    would skew the mesh's normals.
+    """
 
-def add_attribute(
-    buffer: bytearray,
-    buffer_views: List[dict],
-    accessors: List[dict],
-    array: Sequence[float | int],
-    component_type: int,
-    accessor_type: str,
-    target: int,
+    values = np.asarray(values, dtype=np.float64)
+    offset = values.min(axis=0)
+    scale = float((values.max(axis=0) - offset).max()) or 1.0
+    codes = np.rint((values - offset) / scale * 65535.0).astype("<u2")
+    return codes, offset.tolist(), [scale] * values.shape[1]
+
+
+def quantize_snorm16(values: np.ndarray) -> np.ndarray:
+    """Codes for a normalized int16 accessor holding values in ``[-1, 1]``, such as unit normals."""
+
+    return np.rint(np.clip(values, -1.0, 1.0) * 32767.0).astype("<i2")
+
+
+@dataclass
+class VertexAttribute:
+    """One attribute of an interleaved vertex buffer, already in its stored component type."""
+
+    array: np.ndarray
+    component_type: int
+    accessor_type: str
+    normalized: bool = False
+    bounds: bool = False
+
+
+def _append_view(
+    chunks: List[bytes], buffer_views: List[dict], data: bytes, target: int, stride: int | None = None
 ) -> int:
-    if component_type == 5126:
-        data = pack_floats(array)  # type: ignore[arg-type]
-        comps = {"VEC2": 2, "VEC3": 3}[accessor_type]
-        count = len(array) // comps
-        mins = [min(array[i::comps]) for i in range(comps)]
-        maxs = [max(array[i::comps]) for i in range(comps)]
-    else:
-        data = pack_indices(array)  # type: ignore[arg-type]
-        count = len(array)
-        mins = [int(min(array))]
-        maxs = [int(max(array))]
-
-    while len(buffer) % 4:
-        buffer.extend(b"\x00")
-    offset = len(buffer)
-    buffer.extend(data)
-    byte_length = len(data)
-    while len(buffer) % 4:
-        buffer.extend(b"\x00")
+    """Append ``data`` as a new buffer view and return its index."""
+
+    # Views are laid out back to back on 4-byte boundaries; the bytes are copied
+    # into one pre-sized buffer by assemble_buffer once every view is known.
+    offset = 0
+    if buffer_views:
+        offset = _align4(buffer_views[-1]["byteOffset"] + buffer_views[-1]["byteLength"])
+    chunks.append(data)
 
     buffer_view = {
         "buffer": 0,
         "byteOffset": offset,
-        "byteLength": byte_length,
+        "byteLength": len(data),
         "target": target,
     }
+    if stride is not None:
+        buffer_view["byteStride"] = stride
     buffer_views.append(buffer_view)
+    return len(buffer_views) - 1
+
 
+def _accessor(
+    buffer_view: int,
+    component_type: int,
+    accessor_type: str,
+    values: np.ndarray,
+    *,
+    byte_offset: int = 0,
+    normalized: bool = False,
+    bounds: bool = False,
+) -> dict:
     accessor = {
-        "bufferView": len(buffer_views) - 1,
+        "bufferView": buffer_view,
         "componentType": component_type,
-        "count": count,
+        "count": len(values),
         "type": accessor_type,
-        "min": mins,
-        "max": maxs,
     }
-    accessors.append(accessor)
+    if byte_offset:
+        accessor["byteOffset"] = byte_offset
+    if normalized:
+        accessor["normalized"] = True
+    if bounds:
+        # Bounds are taken from the values actually stored in the buffer.
+        accessor["min"] = values.min(axis=0).tolist()
+        accessor["max"] = values.max(axis=0).tolist()
+    return accessor
+
+
+def add_attribute(
+    chunks: List[bytes],
+    buffer_views: List[dict],
+    accessors: List[dict],
+    array: Sequence[float | int] | np.ndarray,
+    component_type: int,
+    accessor_type: str,
+    target: int,
+    *,
+    bounds: bool = False,
+) -> int:
+    """Append ``array`` tightly packed as a new buffer view and accessor and return the accessor index.
+
+    glTF only requires ``min``/``max`` on POSITION accessors, so the values are
+    scanned for bounds only when ``bounds`` is set.
+    """
+
+    values = np.asarray(array, dtype=_COMPONENT_DTYPES[component_type]).reshape(-1, _COMPONENTS[accessor_type])
+    view = _append_view(chunks, buffer_views, values.tobytes(), target)
+    accessors.append(_accessor(view, component_type, accessor_type, values, bounds=bounds))
     return len(accessors) - 1
 
 
-def write_gltf(output: Path) -> None:
-    body = build_body()
-    tail = build_tail()
-    dorsal = build_dorsal()
-    pect_l = build_pectoral_left()
-    pect_r = AttributeBundle(
-        mirror_positions(pect_l.position, "z"),
-        mirror_normals(pect_l.normal, "z"),
-        list(pect_l.uv),
-        list(pect_l.indices),
+def add_interleaved(
+    chunks: List[bytes],
+    buffer_views: List[dict],
+    accessors: List[dict],
+    attributes: Sequence[VertexAttribute],
+    target: int,
+) -> List[int]:
+    """Store ``attributes`` as one interleaved, strided buffer view and return their accessor indices.
+
+    Each element starts on a 4-byte boundary as glTF requires, so e.g. a 16-bit
+    VEC3 takes 8 bytes of the vertex record.
+    """
+
+    columns = [
+        np.ascontiguousarray(attribute.array, dtype=_COMPONENT_DTYPES[attribute.component_type]).reshape(
+            -1, _COMPONENTS[attribute.accessor_type]
+        )
+        for attribute in attributes
+    ]
+    count = len(columns[0])
+    offsets = []
+    stride = 0
+    for values in columns:
+        offsets.append(stride)
+        stride += _align4(values.itemsize * values.shape[1])
+
+    records = np.zeros((count, stride), dtype=np.uint8)
+    for values, offset in zip(columns, offsets):
+        raw = values.view(np.uint8)
+        records[:, offset : offset + raw.shape[1]] = raw
+    view = _append_view(chunks, buffer_views, records.tobytes(), target, stride)
+
+    indices = []
+    for attribute, values, offset in zip(attributes, columns, offsets):
+        accessors.append(
+            _accessor(
+                view,
+                attribute.component_type,
+                attribute.accessor_type,
+                values,
+                byte_offset=offset,
+                normalized=attribute.normalized,
+                bounds=attribute.bounds,
+            )
+        )
+        indices.append(len(accessors) - 1)
+    return indices
+
+
+def assemble_buffer(buffer_views: Sequence[dict], chunks: Sequence[bytes]) -> bytearray:
+    """Copy each view's bytes to its offset in a single zero-padded buffer."""
+
+    total = 0
+    if buffer_views:
+        total = _align4(buffer_views[-1]["byteOffset"] + buffer_views[-1]["byteLength"])
+    buffer = bytearray(total)
+    view = memoryview(buffer)
+    for buffer_view, data in zip(buffer_views, chunks):
+        offset = buffer_view["byteOffset"]
+        view[offset : offset + len(data)] = data
+    return buffer
+
+
+def dump_json(model: dict, indent: int | None = None) -> bytes:
+    """Serialise the glTF document as UTF-8 JSON, compact unless ``indent`` is given."""
+
+    # orjson only knows compact output and two-space indentation.
+    if orjson is not None and indent in (None, 2):
+        return orjson.dumps(model, option=orjson.OPT_INDENT_2 if indent == 2 else 0)
+    separators = (",", ":") if indent is None else (",", ": ")
+    return json.dumps(model, indent=indent, separators=separators).encode("utf-8")
+
+
+GLB_MAGIC = 0x46546C67  # b"glTF"
+GLB_CHUNK_JSON = 0x4E4F534A  # b"JSON"
+GLB_CHUNK_BIN = 0x004E4942  # b"BIN\0"
+
+
+def pack_glb(model: dict, buffer: bytes, indent: int | None = None) -> bytes:
+    """Binary glTF container: 12-byte header, JSON chunk padded with spaces, BIN chunk padded with zeros."""
+
+    json_bytes = dump_json(model, indent)
+    json_bytes += b" " * (_align4(len(json_bytes)) - len(json_bytes))
+    bin_bytes = bytes(buffer) + b"\x00" * (_align4(len(buffer)) - len(buffer))
+    total = 12 + 8 + len(json_bytes) + 8 + len(bin_bytes)
+    return b"".join(
+        (
+            struct.pack("<III", GLB_MAGIC, 2, total),
+            struct.pack("<II", len(json_bytes), GLB_CHUNK_JSON),
+            json_bytes,
+            struct.pack("<II", len(bin_bytes), GLB_CHUNK_BIN),
+            bin_bytes,
+        )
     )
-    pelvic = build_pelvic()
 
-    buffer = bytearray()
+
+DATA_URI_PREFIX = "data:application/octet-stream;base64,"
+
+
+def write_embedded_gltf(fp: BinaryIO, model: dict, buffer: bytearray, indent: int | None = None) -> None:
+    """Write ``model`` as JSON with ``buffer`` embedded as a base64 data URI.
+
+    The document is serialised with only the URI prefix in place and the base64
+    bytes are written straight into the file at that point, so the payload is
+    never decoded to ``str`` or scanned by the JSON encoder.
+    """
+
+    model["buffers"][0]["uri"] = DATA_URI_PREFIX
+    document = dump_json(model, indent)
+    head, _, tail = document.partition(json.dumps(DATA_URI_PREFIX).encode("utf-8"))
+    fp.write(head)
+    fp.write(b'"' + DATA_URI_PREFIX.encode("ascii"))
+    fp.write(base64.b64encode(memoryview(buffer)))
+    fp.write(b'"')
+    fp.write(tail)
+
+
+@contextlib.contextmanager
+def atomic_open(path: Path) -> Iterator[BinaryIO]:
+    """Open a temporary sibling of ``path`` for writing and move it over ``path`` on success.
+
+    A viewer reloading the asset mid-write sees either the old or the new file,
+    never a truncated one.
+    """
+
+    tmp = path.with_name(path.name + ".tmp")
+    try:
+        with tmp.open("wb") as fp:
+            yield fp
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+def write_gltf(
+    output: Path, indent: int | None = None, quantize: bool = True, external: bool = False, detail: float = 1.0
+) -> None:
+    body = build_body(detail)
+    tail = build_tail(detail)
+    dorsal = build_dorsal(detail)
+    pect_l = build_pectoral_left(detail)
+    pelvic = build_pelvic(detail)
+
+    chunks: List[bytes] = []
     buffer_views: List[dict] = []
     accessors: List[dict] = []
+    # Per mesh, the (offset, scale) that decodes its quantised positions.
+    decodes: List[Tuple[List[float], List[float]]] = []
+    # Grids of the same resolution share one cached index array; store it once.
+    index_accessors: Dict[bytes, int] = {}
 
     def add_bundle(bundle: AttributeBundle, target: int = 34962, index_target: int = 34963) -> Tuple[int, int, int, int]:
-        pos = add_attribute(buffer, buffer_views, accessors, bundle.position, 5126, "VEC3", target)
-        normal = add_attribute(buffer, buffer_views, accessors, bundle.normal, 5126, "VEC3", target)
-        uv = add_attribute(buffer, buffer_views, accessors, bundle.uv, 5126, "VEC2", target)
-        idx = add_attribute(buffer, buffer_views, accessors, bundle.indices, 5123, "SCALAR", index_target)
+        if quantize:
+            codes, offset, scale = quantize_unorm16(bundle.position)
+            decodes.append((offset, scale))
+            # Every surface is parameterised over the unit square, so UVs map
+            # straight onto the uint16 range without a texture transform.
+            uv_codes = np.rint(np.clip(bundle.uv, 0.0, 1.0) * 65535.0).astype("<u2")
+            attributes = [
+                VertexAttribute(codes, 5123, "VEC3", normalized=True, bounds=True),
+                VertexAttribute(quantize_snorm16(bundle.normal), 5122, "VEC3", normalized=True),
+                VertexAttribute(uv_codes, 5123, "VEC2", normalized=True),
+            ]
+        else:
+            attributes = [
+                VertexAttribute(bundle.position, 5126, "VEC3", bounds=True),
+                VertexAttribute(bundle.normal, 5126, "VEC3"),
+                VertexAttribute(bundle.uv, 5126, "VEC2"),
+            ]
+        pos, normal, uv = add_interleaved(chunks, buffer_views, accessors, attributes, target)
+        key = bundle.indices.tobytes()
+        idx = index_accessors.get(key)
+        if idx is None:
+            # UNSIGNED_SHORT unless the grid has too many vertices for it.
+            index_type = 5125 if bundle.indices.dtype.itemsize == 4 else 5123
+            idx = add_attribute(chunks, buffer_views, accessors, bundle.indices, index_type, "SCALAR", index_target)
+            index_accessors[key] = idx
         return pos, normal, uv, idx
 
     body_pos, body_nor, body_uv, body_idx = add_bundle(body)
     tail_pos, tail_nor, tail_uv, tail_idx = add_bundle(tail)
     dorsal_pos, dorsal_nor, dorsal_uv, dorsal_idx = add_bundle(dorsal)
     pect_l_pos, pect_l_nor, pect_l_uv, pect_l_idx = add_bundle(pect_l)
-    pect_r_pos, pect_r_nor, pect_r_uv, pect_r_idx = add_bundle(pect_r)
     pelvic_pos, pelvic_nor, pelvic_uv, pelvic_idx = add_bundle(pelvic)
 
-    buffer_uri = "data:application/octet-stream;base64," + base64.b64encode(buffer).decode()
+    buffer = assemble_buffer(buffer_views, chunks)
 
     materials = [
         {
@@ -380,20 +630,6 @@ def write_gltf(output: Path) -> None:
                 }
             ],
         },
-        {
-            "name": "PectoralR",
-            "primitives": [
-                {
-                    "attributes": {
-                        "POSITION": pect_r_pos,
-                        "NORMAL": pect_r_nor,
-                        "TEXCOORD_0": pect_r_uv,
-                    },
-                    "indices": pect_r_idx,
-                    "material": 1,
-                }
-            ],
-        },
         {
             "name": "Pelvic",
             "primitives": [
@@ -433,15 +669,30 @@ def write_gltf(output: Path) -> None:
             "mesh": 3,
         },
         {
+            # Mirror of the left fin across z, sharing its mesh. The negative
+            # determinant flips the winding; the fin material is double-sided.
             "name": "PectoralR",
-            "mesh": 4,
+            "mesh": 3,
+            "scale": [1.0, 1.0, -1.0],
         },
         {
             "name": "Pelvic",
-            "mesh": 5,
+            "mesh": 4,
         },
     ]
 
+    if quantize:
+        # Fold each mesh's dequantisation into the nodes that instance it. The
+        # nodes carry no rotation, so translation and scale compose per axis.
+        for node in nodes:
+            if "mesh" not in node:
+                continue
+            offset, scale = decodes[node["mesh"]]
+            translation = node.get("translation", [0.0, 0.0, 0.0])
+            node_scale = node.get("scale", [1.0, 1.0, 1.0])
+            node["translation"] = [t + s * o for t, s, o in zip(translation, node_scale, offset)]
+            node["scale"] = [s * k for s, k in zip(node_scale, scale)]
+
     model = {
         "asset": {"version": "2.0", "generator": "procedural-goldfish"},
         "scene": 0,
@@ -449,14 +700,90 @@ def write_gltf(output: Path) -> None:
         "nodes": nodes,
         "meshes": meshes,
         "materials": materials,
-        "buffers": [{"byteLength": len(buffer), "uri": buffer_uri}],
+        "buffers": [{"byteLength": len(buffer)}],
         "bufferViews": buffer_views,
         "accessors": accessors,
     }
+    if quantize:
+        model["extensionsUsed"] = ["KHR_mesh_quantization"]
+        model["extensionsRequired"] = ["KHR_mesh_quantization"]
 
     output.parent.mkdir(parents=True, exist_ok=True)
-    output.write_text(json.dumps(model, indent=2))
+    with atomic_open(output) as fp:
+        if output.suffix.lower() == ".glb":
+            # The single buffer without a "uri" refers to the GLB's BIN chunk.
+            fp.write(pack_glb(model, buffer, indent))
+        elif external:
+            bin_path = output.with_suffix(".bin")
+            with atomic_open(bin_path) as bin_fp:
+                bin_fp.write(buffer)
+            model["buffers"][0]["uri"] = bin_path.name
+            fp.write(dump_json(model, indent))
+        else:
+            write_embedded_gltf(fp, model, buffer, indent)
+
+
+DEFAULT_OUTPUT = Path("static/models/goldfish.gltf")
+
+
+def generation_key(indent: int | None, quantize: bool, external: bool, detail: float) -> str:
+    """Hash of everything the output depends on: this script, NumPy and the output settings."""
+
+    digest = hashlib.sha256(Path(__file__).read_bytes())
+    settings = f"numpy={np.__version__};indent={indent};quantize={quantize};external={external};detail={detail}"
+    digest.update(settings.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generate the procedural goldfish glTF asset.")
+    parser.add_argument(
+        "output",
+        nargs="?",
+        type=Path,
+        default=DEFAULT_OUTPUT,
+        help=f"destination .gltf or .glb file (default: {DEFAULT_OUTPUT.as_posix()})",
+    )
+    parser.add_argument(
+        "--indent",
+        type=int,
+        default=None,
+        metavar="N",
+        help="pretty-print the JSON with N spaces (default: compact)",
+    )
+    parser.add_argument(
+        "--external-buffer",
+        action="store_true",
+        help="write the mesh buffer to a .bin file next to a .gltf output instead of a data URI",
+    )
+    parser.add_argument(
+        "--detail",
+        type=float,
+        default=1.0,
+        metavar="F",
+        help="scale every mesh's grid resolution, e.g. 0.5 for a low-detail asset (default: 1.0)",
+    )
+    parser.add_argument("--no-quantize", action="store_true", help="store vertex attributes as float32")
+    parser.add_argument("--force", action="store_true", help="regenerate even if the output is up to date")
+    args = parser.parse_args()
+    if not (math.isfinite(args.detail) and args.detail > 0):
+        parser.error("--detail must be a positive finite number")
+    if args.detail != 1.0 and args.output.resolve() == DEFAULT_OUTPUT.resolve():
+        parser.error("--detail other than 1 needs an explicit output path; it would replace the shipped asset")
+
+    stamp = args.output.with_name(args.output.name + ".stamp")
+    quantize = not args.no_quantize
+    external = args.external_buffer and args.output.suffix.lower() != ".glb"
+    key = generation_key(args.indent, quantize, external, args.detail)
+    outputs = [args.output, stamp]
+    if external:
+        outputs.append(args.output.with_suffix(".bin"))
+    if not args.force and all(path.exists() for path in outputs) and stamp.read_text() == key:
+        print(f"{args.output} is up to date")
+        return
+    write_gltf(args.output, indent=args.indent, quantize=quantize, external=external, detail=args.detail)
+    stamp.write_text(key)
 
 
 if __name__ == "__main__":
-    write_gltf(Path("static/models/goldfish.gltf"))
+    main()